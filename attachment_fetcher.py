@@ -0,0 +1,259 @@
+"""
+Streaming, size-capped, parallel download of text-based Jira attachments.
+"""
+
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from jira_traffic import JiraTraffic
+
+TEXT_EXTENSIONS = (".log", ".txt")
+GZIP_EXTENSIONS = (".log.gz", ".txt.gz")
+ZIP_EXTENSIONS = (".zip",)
+TRUNCATED_NOTE = "\n... [rest of file not decompressed] ...\n"
+
+class HeadTailWindow:
+    """Keeps the first `head_bytes` and last `tail_bytes` of a byte stream and counts the rest."""
+
+    def __init__(self, head_bytes: int, tail_bytes: int):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def feed(self, chunk: bytes):
+        self.total += len(chunk)
+        if len(self.head) < self.head_bytes:
+            take = self.head_bytes - len(self.head)
+            self.head += chunk[:take]
+            chunk = chunk[take:]
+        if chunk and self.tail_bytes:
+            self.tail += chunk
+            if len(self.tail) > self.tail_bytes:
+                del self.tail[:len(self.tail) - self.tail_bytes]
+
+    @property
+    def kept(self) -> int:
+        return len(self.head) + len(self.tail)
+
+    @property
+    def skipped(self) -> int:
+        return self.total - self.kept
+
+    def text(self) -> str:
+        return join_window(bytes(self.head), bytes(self.tail), self.skipped)
+
+def join_window(head: bytes, tail: bytes, skipped: int) -> str:
+    """Decode a head/tail window, cutting partial lines at the gap."""
+    if not skipped:
+        return (head + tail).decode("utf-8", errors="replace")
+    head = head[:head.rfind(b"\n") + 1] if b"\n" in head else head
+    tail = tail[tail.find(b"\n") + 1:] if b"\n" in tail else tail
+    return (
+        head.decode("utf-8", errors="replace")
+        + f"\n... [{skipped} bytes skipped] ...\n"
+        + tail.decode("utf-8", errors="replace")
+    )
+
+class AttachmentFetcher:
+    """
+    Downloads a ticket's text attachments in parallel over one pooled, authenticated session,
+    keeping only a head and tail window of each file within a per-ticket byte budget.
+
+    Byte counters: `bytes_downloaded` is what crossed the wire (compressed for `.gz` and `.zip`);
+    `bytes_read` and `bytes_skipped` are file content kept in and left out of the window.
+    """
+
+    def __init__(self, username: str, api_token: str, max_workers: int = 4, byte_budget: int = 256 * 1024,
+                 head_ratio: float = 0.25, chunk_size: int = 64 * 1024, max_zip_bytes: int = 50 * 1024 * 1024,
+                 max_decompressed_bytes: int = 200 * 1024 * 1024, max_compression_ratio: float = 200,
+                 traffic: Optional[JiraTraffic] = None):
+        self.session = requests.Session()
+        self.session.auth = (username, api_token)
+        if traffic:
+            # Downloads count against the same Jira rate limit as the REST calls
+            traffic.install(self.session, pool_size=max_workers)
+        else:
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="attachment")
+        self.byte_budget = byte_budget
+        self.head_ratio = head_ratio
+        self.chunk_size = chunk_size
+        self.max_zip_bytes = max_zip_bytes
+        # A small archive can expand to gigabytes, so decompression is capped per attachment
+        self.max_decompressed_bytes = max_decompressed_bytes
+        self.max_compression_ratio = max_compression_ratio
+
+    @staticmethod
+    def is_supported(filename: str) -> bool:
+        return filename.lower().endswith(TEXT_EXTENSIONS + GZIP_EXTENSIONS + ZIP_EXTENSIONS)
+
+    def fetch(self, ticket_id: str, attachments: List[Dict]) -> Tuple[str, Dict]:
+        """Return the combined text of a ticket's attachments and its byte counters."""
+        supported = [a for a in attachments if self.is_supported(a["filename"])]
+        stats = {"files": len(supported), "bytes_downloaded": 0, "bytes_read": 0, "bytes_skipped": 0, "errors": 0}
+        if not supported:
+            return "", stats
+        window = max(1, self.byte_budget // len(supported))
+        head_bytes = int(window * self.head_ratio)
+        tail_bytes = window - head_bytes
+
+        futures = [
+            (attachment, self.executor.submit(self._fetch_one, attachment, head_bytes, tail_bytes))
+            for attachment in supported
+        ]
+        contents = []
+        for attachment, future in futures:
+            try:
+                text, downloaded, read, skipped = future.result()
+            except Exception as e:
+                print(f"Error fetching attachment {attachment['filename']} for ticket {ticket_id}: {e}")
+                stats["errors"] += 1
+                continue
+            contents.append(text)
+            stats["bytes_downloaded"] += downloaded
+            stats["bytes_read"] += read
+            stats["bytes_skipped"] += skipped
+        return "\n".join(contents).strip(), stats
+
+    def _fetch_one(self, attachment: Dict, head_bytes: int, tail_bytes: int) -> Tuple[str, int, int, int]:
+        """Fetch one attachment; returns its text and bytes downloaded, read and skipped."""
+        filename = attachment["filename"].lower()
+        if filename.endswith(ZIP_EXTENSIONS):
+            return self._fetch_zip(attachment, head_bytes, tail_bytes)
+        if filename.endswith(GZIP_EXTENSIONS):
+            return self._fetch_gzip(attachment["url"], head_bytes, tail_bytes)
+        size = attachment.get("size") or 0
+        if head_bytes and size > head_bytes + tail_bytes:
+            ranged = self._fetch_ranges(attachment["url"], size, head_bytes, tail_bytes)
+            if ranged is not None:
+                return ranged
+        return self._fetch_stream(attachment["url"], head_bytes, tail_bytes)
+
+    def _fetch_ranges(self, url: str, size: int, head_bytes: int, tail_bytes: int):
+        """Fetch only the head and tail with HTTP Range requests; None if the server ignores ranges."""
+        with self.session.get(url, headers={"Range": f"bytes=0-{head_bytes - 1}"}, stream=True) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                return None
+            head = response.raw.read(head_bytes, decode_content=True)
+        tail = b""
+        if tail_bytes:
+            with self.session.get(url, headers={"Range": f"bytes=-{tail_bytes}"}, stream=True) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    return None
+                tail = response.raw.read(tail_bytes, decode_content=True)
+        read = len(head) + len(tail)
+        skipped = max(0, size - read)
+        return join_window(head, tail, skipped), read, read, skipped
+
+    def _fetch_stream(self, url: str, head_bytes: int, tail_bytes: int) -> Tuple[str, int, int, int]:
+        window = HeadTailWindow(head_bytes, tail_bytes)
+        with self.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                window.feed(chunk)
+        return window.text(), window.total, window.kept, window.skipped
+
+    def _limit(self, head_bytes: int, tail_bytes: int, budget: int) -> int:
+        """How much to decompress: just the head if no tail is kept, otherwise up to `budget`."""
+        return min(head_bytes, budget) if not tail_bytes else budget
+
+    def _fetch_gzip(self, url: str, head_bytes: int, tail_bytes: int) -> Tuple[str, int, int, int]:
+        """
+        Decompress at most `chunk_size` bytes at a time, so a small, highly compressed file cannot
+        expand in memory. Decompression stops once the head is full if no tail is wanted, or after
+        `max_decompressed_bytes`; the tail is then the last part decompressed before the cap.
+        """
+        window = HeadTailWindow(head_bytes, tail_bytes)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        limit = self._limit(head_bytes, tail_bytes, self.max_decompressed_bytes)
+        downloaded = 0
+        with self.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                downloaded += len(chunk)
+                # Loop until zlib wants more input; a full output buffer leaves input in unconsumed_tail
+                while window.total < limit and not decompressor.eof:
+                    output = decompressor.decompress(chunk, min(self.chunk_size, limit - window.total))
+                    window.feed(output)
+                    chunk = decompressor.unconsumed_tail
+                    if not output and not chunk:
+                        break
+                if window.total >= limit or decompressor.eof:
+                    break
+        text = window.text()
+        if window.total >= limit and not decompressor.eof:
+            text = self._truncated(url, text, limit, tail_bytes)
+        return text, downloaded, window.kept, window.skipped
+
+    def _truncated(self, name: str, text: str, limit: int, tail_bytes: int) -> str:
+        if tail_bytes:
+            print(f"Stopped decompressing {name} after {limit} bytes")
+        return text + TRUNCATED_NOTE
+
+    def _fetch_zip(self, attachment: Dict, head_bytes: int, tail_bytes: int) -> Tuple[str, int, int, int]:
+        """
+        Zip archives need their central directory, so they are spooled to disk up to a size cap.
+        Members share the decompression cap. A member whose declared size does not fit in what is
+        left of it, or that claims a suspicious compression ratio, is only read up to its head.
+        """
+        size = attachment.get("size") or 0
+        if size > self.max_zip_bytes:
+            print(f"Skipping {attachment['filename']}: {size} bytes exceeds the zip limit")
+            return "", 0, 0, 0
+        downloaded = 0
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+            with self.session.get(attachment["url"], stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    downloaded += len(chunk)
+                    if downloaded > self.max_zip_bytes:
+                        raise ValueError(f"zip larger than {self.max_zip_bytes} bytes")
+                    spool.write(chunk)
+            spool.seek(0)
+            contents = []
+            read = skipped = 0
+            budget = self.max_decompressed_bytes
+            with zipfile.ZipFile(spool) as archive:
+                members = [m for m in archive.infolist() if m.filename.lower().endswith(TEXT_EXTENSIONS)]
+                for member in members:
+                    member_head, member_tail = head_bytes // len(members), tail_bytes // len(members)
+                    ratio = member.file_size / max(1, member.compress_size)
+                    if member.file_size > budget or ratio > self.max_compression_ratio:
+                        print(f"Reading only the head of {attachment['filename']}/{member.filename}: "
+                              f"{member.file_size} bytes at {ratio:.0f}:1 compression")
+                        member_tail = 0
+                    window = HeadTailWindow(member_head, member_tail)
+                    limit = self._limit(member_head, member_tail, budget)
+                    with archive.open(member) as f:
+                        # ZipExtFile.read(n) returns at most n decompressed bytes, whatever the header claims
+                        while window.total < limit:
+                            chunk = f.read(min(self.chunk_size, limit - window.total))
+                            if not chunk:
+                                break
+                            window.feed(chunk)
+                        more = window.total >= limit and f.read(1)
+                    text = window.text()
+                    budget -= window.total
+                    read += window.kept
+                    skipped += window.skipped
+                    if more:
+                        text = self._truncated(f"{attachment['filename']}/{member.filename}", text, limit,
+                                               member_tail)
+                        # What the header says is left, for the counters only
+                        skipped += max(0, member.file_size - window.total)
+                    contents.append(text)
+        return "\n".join(contents), downloaded, read, skipped
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
\ No newline at end of file
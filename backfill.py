@@ -0,0 +1,159 @@
+"""
+Backfills the similarity store with a project's ticket history, so similarity results are
+useful from the first day after a deploy. It only reads from Jira and never comments.
+
+The store has a single writer, so while the bot is running set BACKFILL_JQL on the bot and
+it backfills on a background thread. With the bot stopped, it can also run on its own, from
+the bot's image with the same STORE_PATH and OLLAMA_EMBED_MODEL:
+    python backfill.py
+An interrupted run resumes from its checkpoint, and a later run only adds newer tickets.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from jira_client import JiraClient, ORDER_BY_PATTERN, TICKET_FIELDS
+from similarity_checker import SimilarityChecker
+from ticket_store import TicketStore
+from vector_index import get_default_embedder
+
+class Backfill:
+    """
+    Streams tickets in key order, one page per request, and ingests each page into the
+    similarity store as a batch. After every batch the last key is checkpointed, so only
+    one page is ever held in memory and a restart continues after the last stored ticket.
+    """
+
+    def __init__(self, jira_client: JiraClient, similarity_checker: SimilarityChecker, jql_filter: str,
+                 checkpoint_path: str, batch_size: int = 100, max_requests_per_minute: float = 30):
+        self.jira_client = jira_client
+        self.similarity_checker = similarity_checker
+        self.base_jql = ORDER_BY_PATTERN.sub("", jql_filter).strip()
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        # Paced below the live bot's Jira quota
+        self.min_interval = 60.0 / max_requests_per_minute if max_requests_per_minute else 0.0
+        self.last_request = 0.0
+        self.complete = False
+        self.checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict:
+        fresh = {"jql": self.base_jql, "last_key": None, "ingested": 0}
+        if not os.path.exists(self.checkpoint_path):
+            return fresh
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return fresh
+        if checkpoint.get("jql") != self.base_jql:
+            print("Backfill JQL changed since the checkpoint was written, starting over")
+            return fresh
+        return checkpoint
+
+    def _save_checkpoint(self):
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def _page_jql(self) -> str:
+        jql = f"({self.base_jql})"
+        if self.checkpoint["last_key"]:
+            # Keyset paging stays correct when issues are added or deleted during a long run
+            jql += f' AND key > "{self.checkpoint["last_key"]}"'
+        return jql + " ORDER BY key ASC"
+
+    def _throttle(self):
+        wait = self.last_request + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_request = time.monotonic()
+
+    @staticmethod
+    def _minimal(ticket: Dict) -> Dict:
+        """Keep only what similarity search and its LLM rerank read."""
+        return {
+            "ticket_id": ticket["ticket_id"],
+            "issue_type": ticket["issue_type"],
+            "summary": ticket["summary"],
+            "description": ticket["description"],
+            "created_at": ticket["created_at"],
+        }
+
+    def run(self, limit: Optional[int] = None) -> int:
+        """
+        Ingest tickets until the history is exhausted (or `limit` more were stored); returns the count.
+        Running it again later picks up only tickets created since.
+        """
+        ingested = 0
+        started = time.monotonic()
+        while limit is None or ingested < limit:
+            self._throttle()
+            page: List[Dict] = self.jira_client.search_page(self._page_jql(), self.batch_size, TICKET_FIELDS)
+            if not page:
+                self.complete = True
+                print(f"Backfill complete: {self.checkpoint['ingested']} tickets in the similarity store")
+                break
+            self.similarity_checker.add_tickets([self._minimal(ticket) for ticket in page])
+            # The store has fsynced the batch, so the checkpoint can safely move past it
+            self.checkpoint["last_key"] = page[-1]["ticket_id"]
+            self.checkpoint["ingested"] += len(page)
+            self._save_checkpoint()
+            ingested += len(page)
+            rate = ingested / max(time.monotonic() - started, 1e-9)
+            print(f"Backfilled {self.checkpoint['ingested']} tickets (up to {page[-1]['ticket_id']}, "
+                  f"{rate:.1f} tickets/s)")
+        return ingested
+
+    def run_in_background(self, retry_interval: float = 60) -> threading.Thread:
+        """Run alongside the live bot on a daemon thread, resuming from the checkpoint after errors."""
+        def loop():
+            while not self.complete:
+                try:
+                    self.run()
+                except Exception as e:
+                    print(f"Backfill error, retrying in {retry_interval:.0f}s: {e}")
+                    time.sleep(retry_interval)
+
+        thread = threading.Thread(target=loop, name="backfill", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict:
+        return {"ingested": self.checkpoint["ingested"], "complete": int(self.complete)}
+
+def main():
+    JIRA_URL = os.getenv("JIRA_URL", "https://your-jira-instance.atlassian.net")
+    USERNAME = os.getenv("JIRA_USERNAME", "your_email@example.com")
+    API_TOKEN = os.getenv("JIRA_API_TOKEN", "your_api_token")
+    BACKFILL_JQL = os.getenv("BACKFILL_JQL", "project = YOUR_PROJECT")
+    STORE_PATH = os.getenv("STORE_PATH")
+    EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL")
+    BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "100"))
+    MAX_REQUESTS_PER_MINUTE = float(os.getenv("BACKFILL_MAX_REQUESTS_PER_MINUTE", "30"))
+
+    if not STORE_PATH:
+        raise SystemExit("STORE_PATH must be set; the backfill seeds the bot's persistent store")
+    CHECKPOINT_PATH = os.getenv("BACKFILL_CHECKPOINT_PATH", os.path.join(STORE_PATH, "backfill.json"))
+
+    embedder = get_default_embedder(EMBED_MODEL)
+    try:
+        store = TicketStore(STORE_PATH, embedder.dim)
+    except RuntimeError as e:
+        raise SystemExit(f"{e}; set BACKFILL_JQL on the running bot to backfill in the background instead")
+    similarity_checker = SimilarityChecker(embedder=embedder, use_llm_rerank=False, store=store)
+    backfill = Backfill(JiraClient(JIRA_URL, USERNAME, API_TOKEN), similarity_checker, BACKFILL_JQL,
+                        CHECKPOINT_PATH, BATCH_SIZE, MAX_REQUESTS_PER_MINUTE)
+    try:
+        backfill.run()
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
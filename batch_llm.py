@@ -0,0 +1,144 @@
+"""
+Batching inference front-end shared by TicketAnalyzer and SimilarityChecker.
+
+Requests from many tickets are collected for a short window and dispatched to the
+model server as concurrent requests, up to a configurable parallelism. OllamaLLM's own
+`batch` runs prompts one after another, so concurrency comes from parallel `invoke`
+calls; the Ollama server must allow it (`OLLAMA_NUM_PARALLEL`).
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+class _Request:
+    __slots__ = ("prompt", "future", "enqueued_at")
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+class BatchingLLM:
+    def __init__(self, llm, max_batch_size: int = 8, max_wait: float = 0.02, parallelism: int = 4):
+        self.llm = llm
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.parallelism = parallelism
+        self.queue = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="llm-batch")
+        self.slots = threading.Semaphore(parallelism)
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=1024)
+        self.queue_waits = deque(maxlen=1024)
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-dispatcher", daemon=True)
+        self.dispatcher.start()
+
+    # Settings are read and written on the wrapped model, so CachedLLM keys and
+    # deterministic mode behave as if it were the model itself
+    @property
+    def model(self) -> str:
+        return self.llm.model
+
+    @property
+    def temperature(self):
+        return self.llm.temperature
+
+    @temperature.setter
+    def temperature(self, value):
+        self.llm.temperature = value
+
+    @property
+    def top_k(self):
+        return self.llm.top_k
+
+    @top_k.setter
+    def top_k(self, value):
+        self.llm.top_k = value
+
+    def invoke(self, prompt: str) -> str:
+        """Queue a prompt and block until its response arrives."""
+        request = _Request(prompt)
+        self.queue.put(request)
+        return request.future.result()
+
+    def _dispatch_loop(self):
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._dispatch(batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch):
+        with self.stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+        for request in batch:
+            # Blocks once `parallelism` requests are running, leaving the rest queued
+            self.slots.acquire()
+            with self.stats_lock:
+                self.in_flight += 1
+            self.executor.submit(self._run, request)
+
+    def _run(self, request: _Request):
+        started = time.monotonic()
+        try:
+            request.future.set_result(self.llm.invoke(request.prompt))
+        except Exception as e:
+            with self.stats_lock:
+                self.errors += 1
+            request.future.set_exception(e)
+        finally:
+            finished = time.monotonic()
+            with self.stats_lock:
+                self.in_flight -= 1
+                self.queue_waits.append(started - request.enqueued_at)
+                self.latencies.append(finished - request.enqueued_at)
+            self.slots.release()
+
+    def stats(self) -> Dict:
+        """Queue depth, batching and per-request latency figures (seconds)."""
+        with self.stats_lock:
+            latencies = sorted(self.latencies)
+            waits = list(self.queue_waits)
+            return {
+                "queue_depth": self.queue.qsize(),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "errors": self.errors,
+                "latency_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+                "latency_p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+                "mean_queue_wait": sum(waits) / len(waits) if waits else 0.0,
+            }
+
+    def close(self):
+        """Finish queued requests and stop the dispatcher."""
+        self.queue.put(None)
+        self.dispatcher.join()
+        self.executor.shutdown(wait=True)
\ No newline at end of file
@@ -0,0 +1,613 @@
+"""
+Offline benchmark for the Jira AI Bot.
+
+Starts a fake Jira REST server (synthetic issues, comments and attachments) and a fake
+Ollama endpoint with configurable latency, then drives `JiraAIBot.process_new_tickets`
+and `JiraAIBot.create_ticket` end to end at several backlog sizes. Each scenario runs in
+a fresh process so its peak RSS is its own. Results are saved as JSON and can be compared
+against a previous run:
+
+    python benchmark.py --sizes 10,1000,10000 --pipeline --output results.json
+    python benchmark.py --sizes 10,1000 --baseline results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+from metrics import LATENCY_BUCKETS, Metrics
+
+USERNAME = "bot@example.com"
+PROJECT_KEY = "BENCH"
+ISSUE_TYPES = ("Bug", "Support", "Task")
+PRIORITIES = ("Highest", "High", "Medium", "Low", "Lowest")
+WORDS = ("timeout", "database", "login", "payment", "cache", "queue", "export", "upload",
+         "latency", "crash", "memory", "certificate", "sync", "report", "search", "billing")
+KEY_IN_PATTERN = re.compile(r"\bkey in \(([^)]*)\)", re.IGNORECASE)
+KEY_AFTER_PATTERN = re.compile(r'\bkey > "?([A-Z][A-Z0-9_]*-\d+)"?', re.IGNORECASE)
+LOG_LINES = (
+    "2024-05-01 12:00:{s:02d},123 INFO  [worker-{n}] Request {n} handled in {n}ms\n",
+    "2024-05-01 12:00:{s:02d},456 WARN  [worker-{n}] Slow query on table orders took {n}ms\n",
+    "2024-05-01 12:00:{s:02d},789 ERROR [worker-{n}] Connection to 10.0.0.{n} refused\n",
+)
+
+@lru_cache(maxsize=8)
+def synthetic_log(size: int) -> bytes:
+    """Deterministic log text of exactly `size` bytes."""
+    out = io.StringIO()
+    written = 0
+    n = 0
+    while written < size:
+        line = LOG_LINES[n % len(LOG_LINES)].format(s=n % 60, n=n % 250)
+        out.write(line)
+        written += len(line)
+        n += 1
+    return out.getvalue().encode("utf-8")[:size]
+
+def ticket_spec(n: int) -> Dict:
+    """Spec for the n-th ticket filed by the creation scenarios."""
+    return {
+        "summary": f"Checkout {WORDS[n % len(WORDS)]} failure #{n}",
+        "description": f"Customers see a 500 error when the {WORDS[(n * 5) % len(WORDS)]} step runs. " * 4,
+        "ticket_type": ISSUE_TYPES[n % len(ISSUE_TYPES)],
+        "project_key": PROJECT_KEY,
+    }
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    # Keep-alive, as real Jira and Ollama servers allow connection reuse
+    protocol_version = "HTTP/1.1"
+    # Without these, headers and body go out as separate segments and hit delayed-ACK stalls
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: Dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+class FakeJiraServer:
+    """In-memory Jira REST v2 stand-in covering the endpoints JiraClient uses."""
+
+    def __init__(self, attachments_per_issue: int = 1, attachment_bytes: int = 64 * 1024,
+                 description_chars: int = 400, host: str = "127.0.0.1"):
+        self.attachments_per_issue = attachments_per_issue
+        self.attachment_bytes = attachment_bytes
+        self.description_chars = description_chars
+        self.lock = threading.Lock()
+        self.issues: Dict[str, Dict] = {}
+        self.order: List[str] = []
+        self.requests: Dict[str, int] = {}
+        self.server = ThreadingHTTPServer((host, 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-jira", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self, issue_count: int):
+        """Replace all issues with `issue_count` fresh, uncommented ones and zero the request counters."""
+        with self.lock:
+            self.issues = {}
+            self.order = []
+            self.requests = {}
+            for n in range(1, issue_count + 1):
+                self._add_issue(self._synthetic_fields(n))
+
+    def request_counts(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.requests)
+
+    def _synthetic_fields(self, n: int) -> Dict:
+        words = [WORDS[(n * 7 + i * 3) % len(WORDS)] for i in range(4)]
+        sentence = f"Users report {words[0]} {words[1]} errors after the {words[2]} {words[3]} change. "
+        description = (sentence * (self.description_chars // len(sentence) + 1))[:self.description_chars]
+        return {
+            "summary": f"{words[0].capitalize()} {words[1]} failure #{n}",
+            "description": description,
+            "issuetype": {"name": ISSUE_TYPES[n % len(ISSUE_TYPES)]},
+            "priority": {"name": PRIORITIES[n % len(PRIORITIES)]},
+        }
+
+    def _add_issue(self, fields: Dict) -> Dict:
+        number = len(self.order) + 1
+        key = f"{PROJECT_KEY}-{number}"
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime())
+        attachments = [
+            {
+                "id": f"{number}{i}",
+                "filename": f"service-{i}.log",
+                "size": self.attachment_bytes,
+                "content": f"{self.url}/secure/attachment/{number}{i}/service-{i}.log",
+            }
+            for i in range(self.attachments_per_issue)
+        ]
+        issue = {
+            "id": str(10000 + number),
+            "key": key,
+            "self": f"{self.url}/rest/api/2/issue/{key}",
+            "fields": {
+                "summary": fields.get("summary", ""),
+                "description": fields.get("description", ""),
+                "issuetype": {"name": (fields.get("issuetype") or {}).get("name", "Task")},
+                "priority": {"name": (fields.get("priority") or {}).get("name", "Medium")},
+                "created": timestamp,
+                "updated": timestamp,
+                "labels": [],
+                "attachment": attachments,
+            },
+            "comments": [],
+        }
+        self.issues[key] = issue
+        self.order.append(key)
+        return issue
+
+    def _render_issue(self, issue: Dict, fields: List[str] = None) -> Dict:
+        all_fields = dict(issue["fields"])
+        all_fields["comment"] = {
+            "comments": issue["comments"],
+            "total": len(issue["comments"]),
+            "maxResults": len(issue["comments"]),
+            "startAt": 0,
+        }
+        if fields and "*all" not in fields:
+            all_fields = {name: value for name, value in all_fields.items() if name in fields}
+        return {"id": issue["id"], "key": issue["key"], "self": issue["self"], "fields": all_fields}
+
+    @staticmethod
+    def _requested_fields(query: Dict) -> List[str]:
+        return [name for value in query.get("fields", []) for name in value.split(",") if name]
+
+    def _make_handler(self):
+        jira = self
+
+        class Handler(_QuietHandler):
+            def _count(self, endpoint: str):
+                with jira.lock:
+                    jira.requests[endpoint] = jira.requests.get(endpoint, 0) + 1
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                if url.path == "/rest/api/2/serverInfo":
+                    self._count("server_info")
+                    self._send_json(200, {"baseUrl": jira.url, "version": "9.12.0",
+                                          "versionNumbers": [9, 12, 0], "deploymentType": "Server"})
+                elif url.path == "/rest/api/2/field":
+                    self._count("fields")
+                    self._send_json(200, [])
+                elif url.path == "/rest/api/2/search":
+                    self._count("search")
+                    self._search(query)
+                elif parts[:4] == ["rest", "api", "2", "issue"] and len(parts) == 5:
+                    self._count("issue_get")
+                    with jira.lock:
+                        issue = jira.issues.get(parts[4])
+                        payload = jira._render_issue(issue, jira._requested_fields(query)) if issue else None
+                    if payload is None:
+                        self._send_json(404, {"errorMessages": ["Issue does not exist"]})
+                    else:
+                        self._send_json(200, payload)
+                elif parts[:4] == ["rest", "api", "2", "issue"] and parts[5:] == ["comment"]:
+                    self._count("comment_get")
+                    with jira.lock:
+                        issue = jira.issues.get(parts[4])
+                        comments = list(issue["comments"]) if issue else []
+                    self._send_json(200, {"comments": comments, "total": len(comments),
+                                          "maxResults": len(comments), "startAt": 0})
+                elif parts[:2] == ["secure", "attachment"]:
+                    self._count("attachment")
+                    self._attachment()
+                else:
+                    self._count("other")
+                    self._send_json(404, {"errorMessages": [f"Unknown path {url.path}"]})
+
+            def _search(self, query: Dict):
+                jql = query.get("jql", [""])[0]
+                start_at = int(query.get("startAt", ["0"])[0])
+                max_results = int(query.get("maxResults", ["50"])[0])
+                fields = jira._requested_fields(query)
+                with jira.lock:
+                    keys = jira.order
+                    key_in = KEY_IN_PATTERN.search(jql)
+                    if key_in:
+                        wanted = {key.strip() for key in key_in.group(1).split(",")}
+                        keys = [key for key in keys if key in wanted]
+                    key_after = KEY_AFTER_PATTERN.search(jql)
+                    if key_after:
+                        after = int(key_after.group(1).rpartition("-")[2])
+                        keys = [key for key in keys if int(key.rpartition("-")[2]) > after]
+                    if "labels not in" in jql:
+                        keys = [key for key in keys if not jira.issues[key]["fields"]["labels"]]
+                    page = [jira._render_issue(jira.issues[key], fields)
+                            for key in keys[start_at:start_at + max_results]]
+                    total = len(keys)
+                self._send_json(200, {"startAt": start_at, "maxResults": max_results,
+                                      "total": total, "issues": page})
+
+            def _attachment(self):
+                data = synthetic_log(jira.attachment_bytes)
+                range_header = self.headers.get("Range", "")
+                if not range_header.startswith("bytes="):
+                    self._send(200, data, "text/plain")
+                    return
+                start, _, end = range_header[len("bytes="):].partition("-")
+                if not start:
+                    chunk = data[-int(end):]
+                    first = len(data) - len(chunk)
+                else:
+                    first = int(start)
+                    chunk = data[first:int(end) + 1] if end else data[first:]
+                self._send(206, chunk, "text/plain",
+                           {"Content-Range": f"bytes {first}-{first + len(chunk) - 1}/{len(data)}"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                body = json.loads(self._body() or b"{}")
+                if url.path == "/rest/api/2/issue":
+                    self._count("issue_create")
+                    with jira.lock:
+                        issue = jira._add_issue(body.get("fields", {}))
+                    self._send_json(201, {"id": issue["id"], "key": issue["key"], "self": issue["self"]})
+                elif url.path == "/rest/api/2/issue/bulk":
+                    self._count("issue_bulk_create")
+                    self._bulk_create(body.get("issueUpdates", []))
+                elif parts[:4] == ["rest", "api", "2", "issue"] and parts[5:] == ["comment"]:
+                    self._count("comment_post")
+                    with jira.lock:
+                        issue = jira.issues.get(parts[4])
+                        if issue is None:
+                            comment = None
+                        else:
+                            comment = {
+                                "id": str(len(issue["comments"]) + 1),
+                                "body": body.get("body", ""),
+                                "author": {"name": USERNAME, "emailAddress": USERNAME},
+                                "created": time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime()),
+                            }
+                            issue["comments"].append(comment)
+                    if comment is None:
+                        self._send_json(404, {"errorMessages": ["Issue does not exist"]})
+                    else:
+                        self._send_json(201, comment)
+                else:
+                    self._count("other")
+                    self._send_json(404, {"errorMessages": [f"Unknown path {url.path}"]})
+
+            def _bulk_create(self, updates: List[Dict]):
+                issues, errors = [], []
+                with jira.lock:
+                    for index, update in enumerate(updates):
+                        fields = update.get("fields", {})
+                        if not fields.get("summary"):
+                            errors.append({"status": 400, "failedElementNumber": index,
+                                           "elementErrors": {"errors": {"summary": "You must specify a summary"}}})
+                            continue
+                        issue = jira._add_issue(fields)
+                        issues.append({"id": issue["id"], "key": issue["key"], "self": issue["self"]})
+                self._send_json(201 if issues else 400, {"issues": issues, "errors": errors})
+
+            def do_PUT(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                body = json.loads(self._body() or b"{}")
+                self._count("issue_update")
+                with jira.lock:
+                    issue = jira.issues.get(parts[-1]) if parts[:4] == ["rest", "api", "2", "issue"] else None
+                    if issue is not None:
+                        for change in body.get("update", {}).get("labels", []):
+                            if "add" in change and change["add"] not in issue["fields"]["labels"]:
+                                issue["fields"]["labels"].append(change["add"])
+                self._send(204 if issue is not None else 404)
+
+        return Handler
+
+class FakeOllamaServer:
+    """Answers Ollama generate and embed calls after a fixed delay."""
+
+    def __init__(self, latency: float = 0.05, response: str = None, embedding_dim: int = 64,
+                 host: str = "127.0.0.1"):
+        self.latency = latency
+        self.response = response or ("Connection pool exhausted while the database was unreachable.\n"
+                                     "Check the database host and the pool size settings.")
+        self.embedding_dim = embedding_dim
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.server = ThreadingHTTPServer((host, 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-ollama", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self.lock:
+            self.requests = {}
+
+    def request_counts(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.requests)
+
+    def _make_handler(self):
+        ollama = self
+
+        class Handler(_QuietHandler):
+            def _count(self, endpoint: str):
+                with ollama.lock:
+                    ollama.requests[endpoint] = ollama.requests.get(endpoint, 0) + 1
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send_json(200, {"version": "0.0.0-fake"})
+                elif self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "gemma3:1b", "model": "gemma3:1b"}]})
+                else:
+                    self._send(200, b"Ollama is running", "text/plain")
+
+            def do_POST(self):
+                request = json.loads(self._body() or b"{}")
+                model = request.get("model", "")
+                if self.path == "/api/generate":
+                    self._count("generate")
+                    time.sleep(ollama.latency)
+                    lines = [
+                        {"model": model, "created_at": "2024-05-01T12:00:00Z", "response": ollama.response,
+                         "done": False},
+                        {"model": model, "created_at": "2024-05-01T12:00:00Z", "response": "", "done": True,
+                         "done_reason": "stop"},
+                    ]
+                    body = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+                    self._send(200, body, "application/x-ndjson")
+                elif self.path == "/api/embed":
+                    self._count("embed")
+                    inputs = request.get("input", [])
+                    inputs = [inputs] if isinstance(inputs, str) else inputs
+                    embeddings = [
+                        [((hash(text) >> (i % 32)) & 0xFF) / 255.0 for i in range(ollama.embedding_dim)]
+                        for text in inputs
+                    ]
+                    self._send_json(200, {"model": model, "embeddings": embeddings})
+                else:
+                    self._count("other")
+                    self._send_json(404, {"error": f"unknown path {self.path}"})
+
+        return Handler
+
+class _RecordingMetrics(Metrics):
+    """Keeps every per-ticket latency so exact percentiles can be reported."""
+
+    def __init__(self):
+        super().__init__()
+        self.ticket_seconds: List[float] = []
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        if name == "ticket_seconds":
+            with self.lock:
+                self.ticket_seconds.append(value)
+        super().observe(name, value, buckets, **labels)
+
+    def stage_means(self) -> Dict[str, float]:
+        totals: Dict[str, List[float]] = {}
+        with self.lock:
+            for key, histogram in self.histograms.get("stage_seconds", {}).items():
+                stage = dict(key)["stage"]
+                total = totals.setdefault(stage, [0.0, 0])
+                total[0] += histogram.total
+                total[1] += histogram.count
+        return {stage: round(total / count, 6) for stage, (total, count) in totals.items() if count}
+
+def run_scenario(config: Dict) -> Dict:
+    """Run one scenario against the fake servers; executed in a fresh process."""
+    os.environ["OLLAMA_HOST"] = config["ollama_url"]
+    output = sys.stdout if config["verbose"] else open(os.devnull, "w")
+    store_dir = tempfile.mkdtemp(prefix="jira-bot-bench-")
+    try:
+        with contextlib.redirect_stdout(output):
+            from jira_agent import JiraAIBot
+
+            options = dict(config["options"])
+            if options.pop("store", False):
+                options["store_path"] = os.path.join(store_dir, "store")
+            bot = JiraAIBot(
+                jira_url=config["jira_url"],
+                username=USERNAME,
+                api_token="benchmark",
+                jql_filter=f"project = {PROJECT_KEY} ORDER BY created ASC",
+                pipeline=config["pipeline"],
+                **options
+            )
+            metrics = bot.metrics = _RecordingMetrics()
+            started = time.perf_counter()
+            if config["scenario"] == "poll":
+                bot.process_new_tickets()
+                latencies = metrics.ticket_seconds
+            elif config["scenario"] == "bulk":
+                results = bot.create_tickets(ticket_spec(n) for n in range(config["size"]))
+                keys_returned = time.perf_counter() - started
+                for result in results:
+                    if "analysis" in result:
+                        result["analysis"].result()
+                latencies = metrics.ticket_seconds
+            else:
+                latencies = []
+                for n in range(config["size"]):
+                    spec = ticket_spec(n)
+                    created = time.perf_counter()
+                    ticket = bot.create_ticket(spec["summary"], spec["description"], spec["ticket_type"],
+                                               spec["project_key"])
+                    if "error" not in ticket:
+                        latencies.append(time.perf_counter() - created)
+            elapsed = time.perf_counter() - started
+            if bot.bulk_pipeline:
+                bot.bulk_pipeline.shutdown()
+            if bot.pipeline and bot.pipeline is not bot.bulk_pipeline:
+                bot.pipeline.shutdown()
+            if bot.batching_llm:
+                bot.batching_llm.close()
+            if bot.ticket_store is not None:
+                bot.ticket_store.close()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        shutil.rmtree(store_dir, ignore_errors=True)
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "processed": len(latencies),
+        "seconds": round(elapsed, 4),
+        "tickets_per_sec": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_p50": round(percentile(latencies, 0.50), 6),
+        "latency_p99": round(percentile(latencies, 0.99), 6),
+        "stage_mean_seconds": metrics.stage_means(),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        **({"keys_returned_seconds": round(keys_returned, 4)} if config["scenario"] == "bulk" else {}),
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def parse_option(value: str):
+    name, _, raw = value.partition("=")
+    try:
+        return name, json.loads(raw)
+    except ValueError:
+        return name, raw
+
+def compare(results: List[Dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result["scenario"], result["size"]))
+        if not previous:
+            continue
+        for metric in ("tickets_per_sec", "latency_p99", "jira_requests_total", "peak_rss_mb"):
+            before, after = previous.get(metric) or 0, result.get(metric) or 0
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            print(f"  {result['scenario']:>6} {result['size']:>6} {metric:<20} {before:>12} -> {after:<12} {change}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Jira AI Bot benchmark")
+    parser.add_argument("--sizes", default="10,1000", help="comma-separated backlog sizes")
+    parser.add_argument("--scenarios", default="poll,create", help="any of poll, create and bulk")
+    parser.add_argument("--create-count", type=int, default=None,
+                        help="tickets to create in the create and bulk scenarios, run once "
+                             "instead of once per size (defaults to each backlog size)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake Ollama delay per request (s)")
+    parser.add_argument("--attachments", type=int, default=1, help="attachments per synthetic issue")
+    parser.add_argument("--attachment-bytes", type=int, default=64 * 1024, help="size of each attachment")
+    parser.add_argument("--description-chars", type=int, default=400, help="length of issue descriptions")
+    parser.add_argument("--pipeline", action="store_true", help="enable the concurrent ticket pipeline")
+    parser.add_argument("--option", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra JiraAIBot keyword argument (JSON value); 'store=true' uses a temp store")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own output")
+    args = parser.parse_args()
+
+    jira = FakeJiraServer(args.attachments, args.attachment_bytes, args.description_chars)
+    ollama = FakeOllamaServer(args.llm_latency)
+    jira.start()
+    ollama.start()
+    options = dict(parse_option(value) for value in args.option)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+        for scenario in args.scenarios.split(","):
+            scenario_sizes = sizes
+            if scenario in ("create", "bulk") and args.create_count is not None:
+                # A fixed create count replaces every size, so the scenario runs only once
+                scenario_sizes = [args.create_count]
+            for size in scenario_sizes:
+                # Creation scenarios start from an empty project so only their own tickets are counted
+                jira.reset(size if scenario == "poll" else 0)
+                ollama.reset()
+                config = {
+                    "scenario": scenario, "size": size, "pipeline": args.pipeline, "options": options,
+                    "jira_url": jira.url, "ollama_url": ollama.url, "verbose": args.verbose,
+                }
+                print(f"Running {scenario} with {size} tickets...")
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_scenario, (config,))
+                jira_requests = jira.request_counts()
+                result = {
+                    "scenario": scenario,
+                    "size": size,
+                    **result,
+                    "jira_requests": jira_requests,
+                    "jira_requests_total": sum(jira_requests.values()),
+                    "jira_requests_per_ticket": round(sum(jira_requests.values()) / max(1, result["processed"]), 3),
+                    "llm_requests": ollama.request_counts(),
+                }
+                results.append(result)
+                print(f"  {result['tickets_per_sec']} tickets/s, p50 {result['latency_p50']:.3f}s, "
+                      f"p99 {result['latency_p99']:.3f}s, {result['jira_requests_total']} Jira requests, "
+                      f"peak RSS {result['peak_rss_mb']} MB")
+    finally:
+        jira.stop()
+        ollama.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "verbose")},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -2,11 +2,15 @@
 # Start Ollama server in the background
 ollama serve &
 
-# Wait for Ollama server to be ready
-sleep 10
+# Wait until the Ollama server answers (up to 60 seconds) instead of sleeping a fixed time
+for _ in $(seq 1 120); do
+    ollama list > /dev/null 2>&1 && break
+    sleep 0.5
+done
 
-# Pull gemma3:1b model if not already present
+# Pull gemma3:1b model if not already present (a quick no-op when it is). This must finish
+# before the bot starts: a ticket analyzed without the model would get a fallback comment
 ollama pull gemma3:1b
 
 # Run the Jira AI bot
-python main.py
\ No newline at end of file
+exec python main.py
\ No newline at end of file
@@ -2,69 +2,371 @@
 Jira AI Bot that creates and processes tickets.
 """
 
+import os
 import time
-from typing import Dict
+from typing import Dict, Iterable, List
+from backfill import Backfill
+from batch_llm import BatchingLLM
 from jira_client import JiraClient
+from jira_poller import IncrementalPoller
+from llm_cache import LLMCache
+from log_condenser import LogCondenser
+from metrics import MeteredLLM, Metrics, MetricsServer
+from model_runtime import ModelRuntime
 from ticket_analyzer import TicketAnalyzer
 from similarity_checker import SimilarityChecker
+from ticket_pipeline import TicketPipeline
+from ticket_lease import TicketCoordinator, open_lease_store
+from ticket_scheduler import TicketScheduler
+from ticket_store import TicketStore
+from triage_classifier import TriageClassifier
+from vector_index import get_default_embedder
+from webhook_server import WebhookServer
 
 class JiraAIBot:
-    def __init__(self, jira_url: str, username: str, api_token: str, jql_filter: str):
-        self.jira_client = JiraClient(jira_url, username, api_token)
-        self.ticket_analyzer = TicketAnalyzer()
-        self.similarity_checker = SimilarityChecker()
-        self.jql_filter = jql_filter
-        self.processed_tickets = set()
+    def __init__(self, jira_url: str, username: str, api_token: str, jql_filter: str,
+                 embed_model: str = None, similarity_llm_rerank: bool = True, store_path: str = None,
+                 pipeline: bool = False, max_in_flight: int = 8, jira_concurrency: int = 4, llm_concurrency: int = 1,
+                 incremental_poll: bool = False, watermark_path: str = None, bot_label: str = None,
+                 llm_cache: bool = False, llm_cache_dir: str = None, llm_cache_ttl: float = 7 * 24 * 3600,
+                 llm_cache_deterministic: bool = False, attachment_workers: int = 4,
+                 attachment_byte_budget: int = 256 * 1024, log_token_budget: int = 1500,
+                 llm_batching: bool = False, llm_parallelism: int = 4, llm_batch_size: int = 8,
+                 llm_batch_window: float = 0.02, triage_model_path: str = None, triage_threshold: float = 0.6,
+                 metrics_port: int = None, profile_dir: str = None, lease_store: str = None,
+                 worker_id: str = None, lease_seconds: float = 600, jira_max_requests_per_second: float = None,
+                 jira_max_retries: int = 4, scheduler: bool = False, priority_head_start: Dict[str, float] = None,
+                 scheduler_deadlines: Dict[str, float] = None, llm_keep_alive: str = "30m", llm_warmup: bool = True,
+                 backfill_jql: str = None, backfill_batch_size: int = 100,
+                 backfill_max_requests_per_minute: float = 30, backfill_checkpoint_path: str = None):
+        # One model runtime for analysis and similarity. Warming it up first lets the model load
+        # while the Jira client and the stores are set up.
+        self.model_runtime = ModelRuntime(keep_alive=llm_keep_alive,
+                                          pool_size=max(llm_concurrency, llm_parallelism if llm_batching else 1))
+        if llm_warmup:
+            self.model_runtime.start()
+        self.jira_client = JiraClient(jira_url, username, api_token, bot_label,
+                                      attachment_workers, attachment_byte_budget,
+                                      jira_max_requests_per_second, jira_max_retries)
+        # One cache shared by analysis and similarity, so either can reuse the other's entries on disk
+        self.llm_cache = LLMCache(cache_dir=llm_cache_dir, ttl_seconds=llm_cache_ttl) if llm_cache else None
+        # With batching, requests from analysis and similarity also batch together
+        self.batching_llm = None
+        if llm_batching:
+            self.batching_llm = BatchingLLM(
+                self.model_runtime,
+                max_batch_size=llm_batch_size,
+                max_wait=llm_batch_window,
+                parallelism=llm_parallelism
+            )
+            # The pipeline must be able to hand over enough requests to fill the batches
+            llm_concurrency = max(llm_concurrency, llm_parallelism)
+        triage_classifier = None
+        if triage_model_path and os.path.exists(triage_model_path):
+            triage_classifier = TriageClassifier.load(triage_model_path)
+        shared_llm = self.batching_llm or self.model_runtime
+        self.ticket_analyzer = TicketAnalyzer(self.llm_cache, llm_cache_deterministic, shared_llm,
+                                              triage_classifier, triage_threshold)
+        self.log_condenser = LogCondenser(log_token_budget) if log_token_budget else None
+        embedder = get_default_embedder(embed_model)
+        # Restore similarity history and processed tickets from disk when a store is configured
+        self.ticket_store = TicketStore(store_path, embedder.dim) if store_path else None
+        self.similarity_checker = SimilarityChecker(
+            embedder=embedder,
+            use_llm_rerank=similarity_llm_rerank,
+            store=self.ticket_store,
+            llm_cache=self.llm_cache,
+            deterministic=llm_cache_deterministic,
+            llm=shared_llm
+        )
+        self.metrics = Metrics(profile_dir=profile_dir)
+        self.metrics_port = metrics_port
+        self.ticket_analyzer.llm = MeteredLLM(self.ticket_analyzer.llm, self.metrics, "analysis")
+        if self.similarity_checker.llm is not None:
+            self.similarity_checker.llm = MeteredLLM(self.similarity_checker.llm, self.metrics, "similarity")
+        if self.llm_cache:
+            self.metrics.register_collector("llm_cache", self.llm_cache.stats)
+        if self.batching_llm:
+            self.metrics.register_collector("llm_batching", self.batching_llm.stats)
+        self.metrics.register_collector("jira_traffic", self.jira_client.traffic.stats)
+        self.metrics.register_collector("model_runtime", self.model_runtime.stats)
+        # With a shared lease store, several workers split the tickets and each is commented on once
+        self.coordinator = None
+        if lease_store:
+            self.coordinator = TicketCoordinator(open_lease_store(lease_store), worker_id, lease_seconds,
+                                                 metrics=self.metrics)
+        # Without a scheduler, tickets are processed in the order Jira returns them
+        self.scheduler = TicketScheduler(priority_head_start, deadlines=scheduler_deadlines,
+                                         metrics=self.metrics) if scheduler else None
+        # The store allows one writer, so a backfill runs inside the bot, sharing its store and Jira traffic
+        self.backfill = None
+        if backfill_jql and self.ticket_store is None:
+            print("BACKFILL_JQL is set without STORE_PATH; skipping the backfill")
+        elif backfill_jql:
+            self.backfill = Backfill(self.jira_client, self.similarity_checker, backfill_jql,
+                                     backfill_checkpoint_path or os.path.join(store_path, "backfill.json"),
+                                     backfill_batch_size, backfill_max_requests_per_minute)
+            self.metrics.register_collector("backfill", self.backfill.stats)
+        self.jql_filter = self.jira_client.unprocessed_jql(jql_filter)
+        self.processed_tickets = self.ticket_store.processed_ids() if self.ticket_store is not None else set()
         self.jira_base_url = jira_url
+        self.pipeline_settings = (max_in_flight, jira_concurrency, llm_concurrency)
+        self.pipeline = TicketPipeline(self, *self.pipeline_settings) if pipeline else None
+        self.bulk_pipeline = None
+        self.poller = IncrementalPoller(self.jira_client, self.jql_filter, watermark_path) if incremental_poll else None
 
     def create_ticket(self, summary: str, description: str, ticket_type: str, project_key: str) -> Dict:
         """Create a new Jira ticket and analyze it."""
         # Create ticket
-        ticket = self.jira_client.create_ticket(summary, description, ticket_type, project_key)
+        with self.metrics.span("create", ticket_type=ticket_type):
+            ticket = self.jira_client.create_ticket(summary, description, ticket_type, project_key)
         if "error" in ticket:
             return ticket
 
         ticket_id = ticket["ticket_id"]
-        # Add ticket to similarity store
-        self.similarity_checker.add_ticket(ticket)
-        # Find similar tickets
-        similar_tickets = self.similarity_checker.find_similar_tickets(ticket, self.jira_base_url)
-        # Fetch logs
-        logs = self.jira_client.fetch_attachment_content(ticket_id)
-        # Analyze ticket
-        comment = self.ticket_analyzer.analyze_ticket(ticket, logs, similar_tickets, self.jira_base_url)
-        # Add comment to Jira
-        self.jira_client.add_comment(ticket_id, comment)
-        self.processed_tickets.add(ticket_id)
+        # Another worker's poll may already have picked the new ticket up
+        if self._claim(ticket_id) != "claimed":
+            ticket["analysis"] = "skipped"
+            return ticket
+        trace = self.metrics.ticket_trace(ticket)
+        try:
+            # Add ticket to similarity store and find similar tickets
+            with trace.span("similarity"):
+                self.similarity_checker.add_ticket(ticket)
+                similar_tickets = self.similarity_checker.find_similar_tickets(ticket, self.jira_base_url)
+            # Fetch logs
+            with trace.span("attachments"):
+                logs = self.fetch_logs(ticket_id, ticket)
+            # Analyze ticket
+            with trace.span("analysis"):
+                comment = self.ticket_analyzer.analyze_ticket(ticket, logs, similar_tickets, self.jira_base_url)
+            # Add comment to Jira
+            with trace.span("comment"):
+                if not self.jira_client.add_comment(ticket_id, comment):
+                    raise RuntimeError(f"Comment on ticket {ticket_id} was not posted")
+        except Exception as e:
+            # The issue exists, so the caller still gets its key; a later poll retries the analysis
+            print(f"Error processing ticket {ticket_id}: {e}")
+            self._release(ticket_id)
+            trace.finish("error", error=str(e))
+            ticket["analysis"] = f"error: {e}"
+            return ticket
+        self._mark_processed(ticket_id)
+        trace.finish("commented", comment_chars=len(comment))
+        ticket["analysis"] = "commented"
         return ticket
 
+    def create_tickets(self, specs: Iterable[Dict], chunk_size: int = 50) -> List[Dict]:
+        """
+        Bulk-create tickets and return one result per spec as soon as all are created.
+
+        Specs are dicts with `summary`, `description`, `ticket_type` and `project_key` (and
+        optional extra Jira `fields`). Issues are created in chunks through Jira's bulk endpoint.
+        Each chunk's tickets start their similarity check, analysis and comment in the background
+        pipeline while the next chunk is created. Each created result carries the `ticket` and an
+        `analysis` future resolving to "commented", "skipped" or "error: ..."; a bad spec only
+        fails its own result.
+        """
+        if self.bulk_pipeline is None:
+            # Reuse the polling pipeline if there is one; sequential polling is left as it is
+            self.bulk_pipeline = self.pipeline or TicketPipeline(self, *self.pipeline_settings)
+        results = []
+        for chunk in self.jira_client.create_tickets(specs, chunk_size):
+            for result in chunk:
+                if result["status"] == "created":
+                    result["analysis"] = self.bulk_pipeline.submit(result["ticket"])
+                    print(f"Created ticket {result['ticket']['ticket_id']}")
+                else:
+                    print(f"Could not create ticket #{result['index']}: {result['error']}")
+                self.metrics.inc("bulk_create_total", status=result["status"])
+                results.append(result)
+        return results
+
+    def fetch_logs(self, ticket_id: str, ticket: Dict) -> str:
+        """Fetch attachment logs and condense them to the prompt's token budget."""
+        if ticket.get("fast_triage"):
+            # Triage does not read logs, so a ticket past its deadline skips the download
+            return ""
+        logs = self.jira_client.fetch_attachment_content(ticket_id, ticket)
+        stats = ticket.get("attachment_stats")
+        if stats:
+            self.metrics.inc("attachment_bytes_total", stats["bytes_downloaded"], kind="downloaded")
+            self.metrics.inc("attachment_bytes_total", stats["bytes_read"], kind="read")
+            self.metrics.inc("attachment_bytes_total", stats["bytes_skipped"], kind="skipped")
+        if self.log_condenser:
+            logs = self.log_condenser.condense(logs)
+        return logs
+
+    def _mark_processed(self, ticket_id: str):
+        """Remember a handled ticket, durably when a store is configured."""
+        self.processed_tickets.add(ticket_id)
+        if self.ticket_store is not None:
+            self.ticket_store.mark_processed(ticket_id)
+        self._release(ticket_id, done=True)
+
+    def _claim(self, ticket_id: str) -> str:
+        """
+        Take the ticket's lease when workers are coordinated: "claimed", "held" by another
+        worker, or "done". A single worker always claims.
+        """
+        if not self.coordinator:
+            return "claimed"
+        result = self.coordinator.claim(ticket_id)
+        if result == "done":
+            # Finished by another worker; skip it from now on like our own
+            self.processed_tickets.add(ticket_id)
+        return result
+
+    def _release(self, ticket_id: str, done: bool = False):
+        if done and self.scheduler:
+            self.scheduler.forget(ticket_id)
+        if self.coordinator:
+            self.coordinator.release(ticket_id, done)
+
     def process_new_tickets(self):
         """Process new tickets and add comments."""
-        tickets = self.jira_client.get_tickets(self.jql_filter)
+        with self.metrics.span("poll"):
+            if self.poller:
+                tickets = self.poller.poll()
+            else:
+                tickets = self.jira_client.get_tickets(self.jql_filter)
+        self.metrics.inc("polls_total")
+        self.metrics.set_gauge("poll_tickets", len(tickets))
+        pending = []
+        if self.coordinator:
+            # Other workers' unfinished tickets are held back like failures so the watermark waits for them
+            tickets, pending = self.coordinator.partition(tickets)
+        failed = self._process_tickets(tickets)
+        if self.poller:
+            self.poller.commit(failed + pending)
+
+    def process_ticket_keys(self, keys: List[str]):
+        """Process the tickets named by webhook events, if they still match the JQL filter."""
+        keys = [key for key in keys if key not in self.processed_tickets]
+        if not keys:
+            return
+        with self.metrics.span("webhook_fetch"):
+            tickets = self.jira_client.get_tickets_by_keys(keys, self.jql_filter)
+        self._process_tickets(tickets)
+
+    def _process_tickets(self, tickets: List[Dict]) -> List[str]:
+        """Process tickets through the pipeline or one by one; returns the ids that are not finished."""
+        if self.scheduler:
+            # Finished tickets would only skew the queue-wait figures
+            queue = self.scheduler.drain(t for t in tickets if t["ticket_id"] not in self.processed_tickets)
+            try:
+                return self._dispatch(queue)
+            finally:
+                # Closing the queue drops tickets left behind by an error
+                queue.close()
+        return self._dispatch(tickets)
+
+    def _dispatch(self, tickets: Iterable[Dict]) -> List[str]:
+        if self.pipeline:
+            results = self.pipeline.process(tickets)
+            return [ticket_id for ticket_id, status in results.items()
+                    if status.startswith("error") or status == "claimed elsewhere"]
+        return self._process_sequentially(tickets)
+
+    def _process_sequentially(self, tickets: Iterable[Dict]) -> List[str]:
+        """Process tickets one after another; returns the ids that failed or are claimed by other workers."""
+        unfinished = []
         for ticket in tickets:
             ticket_id = ticket["ticket_id"]
-            if ticket_id not in self.processed_tickets and not self.jira_client.has_bot_comment(ticket_id):
+            if ticket_id in self.processed_tickets:
+                continue
+            claim = self._claim(ticket_id)
+            if claim != "claimed":
+                if claim == "held":
+                    unfinished.append(ticket_id)
+                continue
+            trace = self.metrics.ticket_trace(ticket)
+            try:
+                with trace.span("dedupe"):
+                    already_commented = self.jira_client.has_bot_comment(ticket_id, ticket)
+                if already_commented:
+                    self._release(ticket_id, done=True)
+                    trace.finish("skipped", log=False)
+                    continue
                 print(f"Processing new ticket {ticket_id}: {ticket['summary']}")
-                # Add ticket to similarity store
-                self.similarity_checker.add_ticket(ticket)
-                # Find similar tickets
-                similar_tickets = self.similarity_checker.find_similar_tickets(ticket, self.jira_base_url)
+                # Add ticket to similarity store and find similar tickets
+                with trace.span("similarity"):
+                    self.similarity_checker.add_ticket(ticket)
+                    similar_tickets = self.similarity_checker.find_similar_tickets(ticket, self.jira_base_url)
                 # Fetch logs
-                logs = self.jira_client.fetch_attachment_content(ticket_id)
+                with trace.span("attachments"):
+                    logs = self.fetch_logs(ticket_id, ticket)
                 # Analyze ticket and format response
-                comment = self.ticket_analyzer.analyze_ticket(ticket, logs, similar_tickets, self.jira_base_url)
+                with trace.span("analysis"):
+                    comment = self.ticket_analyzer.analyze_ticket(ticket, logs, similar_tickets, self.jira_base_url)
                 # Add comment to Jira
-                self.jira_client.add_comment(ticket_id, comment)
-                self.processed_tickets.add(ticket_id)
+                with trace.span("comment"):
+                    if not self.jira_client.add_comment(ticket_id, comment):
+                        raise RuntimeError(f"Comment on ticket {ticket_id} was not posted")
+                self._mark_processed(ticket_id)
+                trace.finish("commented", comment_chars=len(comment))
+            except Exception as e:
+                # One failing ticket must not hold up the rest of the poll
+                print(f"Error processing ticket {ticket_id}: {e}")
+                self._release(ticket_id)
+                trace.finish("error", error=str(e))
+                unfinished.append(ticket_id)
+        return unfinished
 
     def run(self, poll_interval: int = 60):
         """Run the bot to periodically check for new tickets."""
         print("Starting Jira AI Bot...")
+        self._start_metrics_server()
+        self._start_backfill()
         while True:
             try:
-                self.process_new_tickets()
+                with self.metrics.maybe_profile():
+                    self.process_new_tickets()
+                if self.ticket_store is not None:
+                    self.ticket_store.maybe_compact()
+                if self.llm_cache:
+                    print(f"LLM cache: {self.llm_cache.stats()}")
+                if self.batching_llm:
+                    print(f"LLM batching: {self.batching_llm.stats()}")
                 print(f"Waiting {poll_interval} seconds before next check...")
                 time.sleep(poll_interval)
             except Exception as e:
                 print(f"Error: {e}")
-                time.sleep(poll_interval)
\ No newline at end of file
+                time.sleep(poll_interval)
+
+    def run_webhooks(self, port: int = 8080, secret: str = None, reconcile_interval: int = 900,
+                     queue_size: int = 1000):
+        """Process tickets as Jira webhooks arrive, with a slow reconciliation poll for missed events."""
+        print("Starting Jira AI Bot in webhook mode...")
+        self._start_metrics_server()
+        self._start_backfill()
+        webhooks = WebhookServer(secret, port, queue_size=queue_size, metrics=self.metrics)
+        webhooks.start()
+        # Reconcile at startup to pick up tickets created while the bot was down
+        next_reconcile = time.monotonic()
+        while True:
+            try:
+                if webhooks.overflowed.is_set() or time.monotonic() >= next_reconcile:
+                    webhooks.overflowed.clear()
+                    with self.metrics.maybe_profile():
+                        self.process_new_tickets()
+                    if self.ticket_store is not None:
+                        self.ticket_store.maybe_compact()
+                    next_reconcile = time.monotonic() + reconcile_interval
+                timeout = max(0.0, min(1.0, next_reconcile - time.monotonic()))
+                keys = webhooks.drain(timeout)
+                if keys:
+                    # A requested profile covers whichever comes first: a reconcile or a batch of webhook keys
+                    with self.metrics.maybe_profile():
+                        self.process_ticket_keys(keys)
+            except Exception as e:
+                print(f"Error: {e}")
+                time.sleep(1)
+
+    def _start_backfill(self):
+        if self.backfill and not self.backfill.complete:
+            self.backfill.run_in_background()
+
+    def _start_metrics_server(self):
+        if self.metrics_port:
+            MetricsServer(self.metrics, self.metrics_port).start()
\ No newline at end of file
@@ -2,14 +2,51 @@
 Handles interactions with Jira API for ticket creation and retrieval.
 """
 
-from typing import List, Dict
-from jira import JIRA
-import requests
+import json
+import re
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from attachment_fetcher import AttachmentFetcher
+from jira_traffic import JiraTraffic
+
+# Fields the bot reads from search results; everything else stays on the server
+TICKET_FIELDS = "issuetype,priority,summary,description,created,updated"
+# Comment authors and attachment metadata, fetched with the search so dedupe and
+# attachment handling need no per-ticket round-trips
+SNAPSHOT_FIELDS = TICKET_FIELDS + ",comment,attachment"
+
+# Jira accepts at most 50 issues per bulk-create request
+BULK_CREATE_LIMIT = 50
+
+ORDER_BY_PATTERN = re.compile(r"\s+ORDER\s+BY\s+.*$", re.IGNORECASE | re.DOTALL)
 
 class JiraClient:
-    def __init__(self, jira_url: str, username: str, api_token: str):
-        self.jira = JIRA(server=jira_url, basic_auth=(username, api_token))
+    def __init__(self, jira_url: str, username: str, api_token: str, bot_label: Optional[str] = None,
+                 attachment_workers: int = 4, attachment_byte_budget: int = 256 * 1024,
+                 max_requests_per_second: Optional[float] = None, max_retries: int = 4):
+        self.traffic = JiraTraffic(rate=max_requests_per_second, max_retries=max_retries)
+        # Retries are left to the traffic layer, which backs off with jitter and shares one rate limit
+        # Imported here rather than at module level to keep the bot's startup import cheap
+        from jira import JIRA
+        self.jira = JIRA(server=jira_url, basic_auth=(username, api_token), max_retries=0)
+        self.traffic.install(self.jira._session)
         self.username = username
+        self.bot_label = bot_label
+        # Set once Jira refuses to skip notifications (that needs admin rights), so labels are added plainly
+        self.label_notifies = False
+        self.attachment_fetcher = AttachmentFetcher(
+            username, api_token, max_workers=attachment_workers, byte_budget=attachment_byte_budget,
+            traffic=self.traffic
+        )
+
+    def unprocessed_jql(self, jql_filter: str) -> str:
+        """Exclude issues carrying the bot marker label, when one is configured."""
+        if not self.bot_label:
+            return jql_filter
+        order_by = ORDER_BY_PATTERN.search(jql_filter)
+        base = jql_filter[:order_by.start()] if order_by else jql_filter
+        jql = f'({base.strip()}) AND (labels is EMPTY OR labels not in ("{self.bot_label}"))'
+        return jql + order_by.group(0) if order_by else jql
 
     def create_ticket(self, summary: str, description: str, ticket_type: str, project_key: str) -> Dict:
         """Create a Jira ticket with the specified details."""
@@ -21,67 +58,250 @@ class JiraClient:
         }
         try:
             issue = self.jira.create_issue(fields=issue_dict)
-            return {
-                "ticket_id": issue.key,
-                "issue_type": ticket_type,
-                "summary": summary,
-                "description": description,
-                "created_at": issue.fields.created,
-                "key": issue.key,
-                "fields": {
-                    "summary": summary,
-                    "description": description
-                }
-            }
+            return self._new_ticket(issue.key, summary, description, ticket_type, issue.fields.created)
         except Exception as e:
             print(f"Error creating ticket: {e}")
             return {"error": str(e)}
 
+    def create_tickets(self, specs: Iterable[Dict], chunk_size: int = BULK_CREATE_LIMIT) -> Iterator[List[Dict]]:
+        """
+        Create tickets through Jira's bulk-create endpoint, `chunk_size` at a time.
+
+        Each spec has `summary`, `ticket_type` and `project_key`, plus optional `description` and
+        extra Jira `fields`. Yields one list of results per chunk as soon as it is created; each
+        result has the spec's `index`, a `status` of "created" or "error", and the `ticket` or `error`.
+        """
+        chunk: List[Tuple[int, Dict]] = []
+        for index, spec in enumerate(specs):
+            chunk.append((index, spec))
+            if len(chunk) == chunk_size:
+                yield self._create_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield self._create_chunk(chunk)
+
+    def _create_chunk(self, chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+        results = {}
+        valid = []
+        for index, spec in chunk:
+            missing = [name for name in ("summary", "ticket_type", "project_key") if not spec.get(name)]
+            if missing:
+                results[index] = {"index": index, "status": "error", "error": f"missing {', '.join(missing)}"}
+            else:
+                valid.append((index, spec))
+        if valid:
+            field_list = [
+                {
+                    **spec.get("fields", {}),
+                    "project": {"key": spec["project_key"]},
+                    "summary": spec["summary"],
+                    "description": spec.get("description", ""),
+                    "issuetype": {"name": spec["ticket_type"]}
+                }
+                for _, spec in valid
+            ]
+            try:
+                # Skip the per-issue refetch; the bot already has every field it needs
+                created = self.jira.create_issues(field_list, prefetch=False)
+            except Exception as e:
+                print(f"Error bulk-creating {len(valid)} tickets: {e}")
+                created = [{"status": "Error", "error": str(e)}] * len(valid)
+            # Bulk-create responses carry only keys, so stamp the creation time locally
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000%z")
+            for (index, spec), outcome in zip(valid, created):
+                if outcome["status"] == "Success":
+                    ticket = self._new_ticket(outcome["issue"].key, spec["summary"], spec.get("description", ""),
+                                              spec["ticket_type"], now)
+                    results[index] = {"index": index, "status": "created", "ticket": ticket}
+                else:
+                    results[index] = {"index": index, "status": "error", "error": str(outcome["error"])}
+        return [results[index] for index, _ in chunk]
+
+    @staticmethod
+    def _new_ticket(key: str, summary: str, description: str, ticket_type: str, created_at: str) -> Dict:
+        return {
+            "ticket_id": key,
+            "issue_type": ticket_type,
+            "summary": summary,
+            "description": description,
+            "created_at": created_at,
+            "key": key,
+            # A new issue has no comments or attachments yet
+            "bot_commented": False,
+            "attachments": [],
+            "fields": {
+                "summary": summary,
+                "description": description
+            }
+        }
+
     def get_tickets(self, jql_filter: str) -> List[Dict]:
-        """Fetch tickets matching the JQL filter."""
+        """Fetch all tickets matching the JQL filter, page by page."""
         try:
-            tickets = self.jira.search_issues(jql_filter, maxResults=100)
-            return [{
-                "ticket_id": ticket.key,
-                "issue_type": ticket.fields.issuetype.name,
-                "summary": ticket.fields.summary,
-                "description": ticket.fields.description or "",
-                "created_at": ticket.fields.created,
-                "key": ticket.key,
-                "fields": {
-                    "summary": ticket.fields.summary,
-                    "description": ticket.fields.description or ""
-                }
-            } for ticket in tickets]
+            return list(self.iter_tickets(jql_filter))
         except Exception as e:
             print(f"Error fetching tickets: {e}")
             return []
 
-    def fetch_attachment_content(self, ticket_id: str) -> str:
-        """Fetch and read text-based attachments (e.g., .log, .txt)."""
-        ticket = self.jira.issue(ticket_id)
-        attachments = ticket.fields.attachment
-        log_content = ""
-        for attachment in attachments:
-            if attachment.filename.endswith((".log", ".txt")):
-                try:
-                    response = requests.get(attachment.content, auth=(self.username, self.jira._options["basic_auth"][1]))
-                    response.raise_for_status()
-                    log_content += response.text + "\n"
-                except Exception as e:
-                    print(f"Error fetching attachment {attachment.filename} for ticket {ticket_id}: {e}")
-        return log_content.strip()
-
-    def has_bot_comment(self, ticket_id: str) -> bool:
-        """Check if the bot has already commented on the ticket."""
-        ticket = self.jira.issue(ticket_id)
-        comments = self.jira.comments(ticket)
-        return any(comment.author.emailAddress == self.username for comment in comments)
-
-    def add_comment(self, ticket_id: str, comment: str):
-        """Add a comment to the specified ticket."""
+    def get_tickets_by_keys(self, keys: List[str], jql_filter: str) -> List[Dict]:
+        """Fetch the given issues, keeping only those that still match the JQL filter."""
+        if not keys:
+            return []
+        order_by = ORDER_BY_PATTERN.search(jql_filter)
+        base = jql_filter[:order_by.start()] if order_by else jql_filter
+        jql = f"key in ({', '.join(keys)}) AND ({base.strip()})"
+        try:
+            # Without validation Jira skips keys deleted or moved since the webhook, instead of
+            # rejecting the whole batch
+            return list(self.iter_tickets(jql + order_by.group(0) if order_by else jql, validate_query=False))
+        except Exception as e:
+            print(f"Error fetching tickets {', '.join(keys)}: {e}")
+            return []
+
+    def iter_tickets(self, jql_filter: str, page_size: int = 100, fields: str = SNAPSHOT_FIELDS,
+                     validate_query: bool = True) -> Iterator[Dict]:
+        """Yield tickets matching the JQL filter, fetching only the fields the bot uses."""
+        start_at = 0
+        while True:
+            page = self.jira.search_issues(jql_filter, startAt=start_at, maxResults=page_size, fields=fields,
+                                           validate_query=validate_query)
+            for issue in page:
+                yield self._to_ticket(issue)
+            start_at += len(page)
+            if not page or start_at >= page.total:
+                break
+
+    def search_page(self, jql_filter: str, max_results: int = 100, fields: str = TICKET_FIELDS) -> List[Dict]:
+        """Fetch a single page of tickets; callers page with the JQL itself (e.g. `key > X`)."""
+        return [self._to_ticket(issue) for issue in
+                self.jira.search_issues(jql_filter, startAt=0, maxResults=max_results, fields=fields)]
+
+    def iter_labelled_tickets(self, jql_filter: str, label_field: str = "components",
+                              page_size: int = 100) -> Iterator[Dict]:
+        """Yield summary, description and the team/component label of historical tickets."""
+        start_at = 0
+        while True:
+            page = self.jira.search_issues(jql_filter, startAt=start_at, maxResults=page_size,
+                                           fields=f"summary,description,{label_field}")
+            for issue in page:
+                label = self._field_label(getattr(issue.fields, label_field, None))
+                if label:
+                    yield {
+                        "ticket_id": issue.key,
+                        "summary": issue.fields.summary,
+                        "description": issue.fields.description or "",
+                        "label": label
+                    }
+            start_at += len(page)
+            if not page or start_at >= page.total:
+                break
+
+    @staticmethod
+    def _field_label(value) -> Optional[str]:
+        """Reduce a component list, user, option or plain field value to a label."""
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value is None:
+            return None
+        for attribute in ("name", "displayName", "value"):
+            if hasattr(value, attribute):
+                return getattr(value, attribute)
+        return str(value)
+
+    def _to_ticket(self, issue) -> Dict:
+        ticket = {
+            "ticket_id": issue.key,
+            "issue_type": issue.fields.issuetype.name,
+            "priority": getattr(getattr(issue.fields, "priority", None), "name", None),
+            "summary": issue.fields.summary,
+            "description": issue.fields.description or "",
+            "created_at": issue.fields.created,
+            "updated_at": issue.fields.updated,
+            "key": issue.key,
+            "fields": {
+                "summary": issue.fields.summary,
+                "description": issue.fields.description or ""
+            }
+        }
+        self._apply_snapshot(ticket, issue)
+        return ticket
+
+    def _apply_snapshot(self, ticket: Dict, issue):
+        """Record bot-comment state and attachment metadata from an issue's comment/attachment fields."""
+        comment_field = getattr(issue.fields, "comment", None)
+        if comment_field is not None:
+            comments = comment_field.comments
+            if any(self._is_bot_comment(comment) for comment in comments):
+                ticket["bot_commented"] = True
+            elif len(comments) >= comment_field.total:
+                ticket["bot_commented"] = False
+            else:
+                # The page of comments was truncated, so the state is unknown
+                ticket["bot_commented"] = None
+        attachments = getattr(issue.fields, "attachment", None)
+        if attachments is not None:
+            ticket["attachments"] = [
+                {"filename": attachment.filename, "url": attachment.content, "size": attachment.size}
+                for attachment in attachments
+            ]
+
+    def _is_bot_comment(self, comment) -> bool:
+        return getattr(comment.author, "emailAddress", None) == self.username
+
+    def _ensure_snapshot(self, ticket_id: str, ticket: Optional[Dict]) -> Dict:
+        """Fetch comment/attachment state once for tickets that did not come with it."""
+        ticket = ticket if ticket is not None else {}
+        if "bot_commented" not in ticket or "attachments" not in ticket:
+            issue = self.jira.issue(ticket_id, fields="comment,attachment")
+            self._apply_snapshot(ticket, issue)
+        return ticket
+
+    def fetch_attachment_content(self, ticket_id: str, ticket: Optional[Dict] = None) -> str:
+        """Fetch and read text-based attachments (e.g., .log, .txt, .log.gz, .zip) within the byte budget."""
+        ticket = self._ensure_snapshot(ticket_id, ticket)
+        log_content, stats = self.attachment_fetcher.fetch(ticket_id, ticket.get("attachments", []))
+        ticket["attachment_stats"] = stats
+        if stats["files"]:
+            print(f"Fetched {stats['files']} attachment(s) for ticket {ticket_id}: "
+                  f"{stats['bytes_downloaded']} bytes downloaded, {stats['bytes_read']} bytes read, "
+                  f"{stats['bytes_skipped']} bytes skipped")
+        return log_content
+
+    def _add_label(self, ticket_id: str):
+        """Add the bot label with a single PUT that does not notify the issue's watchers."""
+        url = self.jira._get_url(f"issue/{ticket_id}")
+        body = json.dumps({"update": {"labels": [{"add": self.bot_label}]}})
+        if self.label_notifies:
+            self.jira._session.put(url, data=body)
+            return
+        try:
+            self.jira._session.put(url, params={"notifyUsers": "false"}, data=body)
+        except Exception as e:
+            if getattr(e, "status_code", None) != 403:
+                raise
+            self.label_notifies = True
+            self.jira._session.put(url, data=body)
+
+    def has_bot_comment(self, ticket_id: str, ticket: Optional[Dict] = None) -> bool:
+        """Check if the bot has already commented on the ticket, reusing the ticket's snapshot when present."""
+        ticket = self._ensure_snapshot(ticket_id, ticket)
+        if ticket.get("bot_commented") is None:
+            comments = self.jira.comments(ticket_id)
+            ticket["bot_commented"] = any(self._is_bot_comment(comment) for comment in comments)
+        return ticket["bot_commented"]
+
+    def add_comment(self, ticket_id: str, comment: str) -> bool:
+        """Add a comment to the specified ticket; returns whether it was posted."""
         try:
             self.jira.add_comment(ticket_id, comment)
-            print(f"Commented on ticket {ticket_id}: {comment[:100]}...")
         except Exception as e:
-            print(f"Error adding comment to ticket {ticket_id}: {e}")
\ No newline at end of file
+            print(f"Error adding comment to ticket {ticket_id}: {e}")
+            return False
+        print(f"Commented on ticket {ticket_id}: {comment[:100]}...")
+        if self.bot_label:
+            try:
+                self._add_label(ticket_id)
+            except Exception as e:
+                # The comment is posted, and the bot-comment check still recognises the ticket as done
+                print(f"Error labelling ticket {ticket_id}: {e}")
+        return True
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Incremental JQL polling with a durable high-water mark.
+"""
+
+import json
+import math
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from jira_client import JiraClient, ORDER_BY_PATTERN
+
+def parse_jira_timestamp(value: str) -> datetime:
+    """Parse Jira's `2024-05-01T10:22:33.000+0000` timestamps."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+def key_order(key: str) -> Tuple[str, int]:
+    """Sort key matching Jira's `ORDER BY key` (project, then issue number)."""
+    project, _, number = key.rpartition("-")
+    return (project, int(number)) if number.isdigit() else (key, 0)
+
+class IncrementalPoller:
+    """
+    Polls only issues updated since the last committed watermark (`updated` plus the last key).
+    The watermark is saved to `watermark_path`, if given, so restarts resume where they left off.
+    """
+
+    def __init__(self, jira_client: JiraClient, jql_filter: str, watermark_path: Optional[str] = None,
+                 page_size: int = 100, overlap_minutes: int = 2):
+        self.jira_client = jira_client
+        self.base_jql = ORDER_BY_PATTERN.sub("", jql_filter).strip()
+        self.watermark_path = watermark_path
+        self.page_size = page_size
+        # JQL has minute granularity and clocks may drift, so each query reaches back a little;
+        # anything at or before the watermark is filtered out client-side
+        self.overlap_minutes = overlap_minutes
+        self.watermark = self._load_watermark()
+        self._pending: List[Dict] = []
+
+    def _load_watermark(self) -> Optional[Dict]:
+        if not self.watermark_path or not os.path.exists(self.watermark_path):
+            return None
+        try:
+            with open(self.watermark_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable watermark {self.watermark_path}: {e}")
+            return None
+
+    def _save_watermark(self):
+        if not self.watermark_path:
+            return
+        tmp = self.watermark_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.watermark, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.watermark_path)
+
+    def _build_jql(self) -> str:
+        jql = self.base_jql
+        if self.watermark:
+            elapsed = datetime.now(timezone.utc) - parse_jira_timestamp(self.watermark["updated"])
+            minutes = max(0, math.ceil(elapsed.total_seconds() / 60)) + self.overlap_minutes
+            # A relative date avoids depending on the Jira user's timezone
+            jql = f"({jql}) AND updated >= -{minutes}m"
+        return f"{jql} ORDER BY updated ASC, key ASC"
+
+    def _is_new(self, ticket: Dict) -> bool:
+        if not self.watermark:
+            return True
+        updated = parse_jira_timestamp(ticket["updated_at"])
+        mark = parse_jira_timestamp(self.watermark["updated"])
+        if updated != mark:
+            return updated > mark
+        return key_order(ticket["ticket_id"]) > key_order(self.watermark["key"])
+
+    def poll(self) -> List[Dict]:
+        """Fetch all issues changed since the watermark, oldest first."""
+        try:
+            tickets = [
+                ticket for ticket in self.jira_client.iter_tickets(self._build_jql(), self.page_size)
+                if self._is_new(ticket)
+            ]
+        except Exception as e:
+            print(f"Error polling tickets: {e}")
+            return []
+        # Pages can shift if issues change mid-poll; keep the commit order strict
+        tickets.sort(key=lambda t: (parse_jira_timestamp(t["updated_at"]), key_order(t["ticket_id"])))
+        self._pending = tickets
+        return tickets
+
+    def commit(self, failed_ids=()):
+        """
+        Advance and persist the watermark over the last poll's tickets,
+        stopping before the first ticket that failed so it is fetched again.
+        """
+        failed_ids = set(failed_ids)
+        last = None
+        for ticket in self._pending:
+            if ticket["ticket_id"] in failed_ids:
+                break
+            last = ticket
+        self._pending = []
+        if last is None:
+            return
+        self.watermark = {"updated": last["updated_at"], "key": last["ticket_id"]}
+        self._save_watermark()
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Client-side traffic control for Jira: an adaptive token bucket, retries with exponential
+backoff and jitter, and coalescing of identical concurrent GETs. It is installed as a
+requests transport adapter, so it covers every JiraClient call, attachment downloads included.
+"""
+
+import copy
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+RETRY_STATUSES = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose rate halves when Jira throttles (and pauses for Retry-After), eases off
+    when Jira reports it is near its limit, and climbs back linearly after successful requests.
+
+    Without a `rate` ceiling, requests are not limited at all until Jira first pushes back. The
+    bucket then starts from the rate actually observed over the last second, and lifts the limit
+    again once it has climbed back to that rate.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None, min_rate: float = 0.5,
+                 recovery: float = 0.05):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate) if rate else min_rate
+        # Defaults to two seconds' worth of requests at the current rate
+        self.burst = burst
+        self.recovery = recovery
+        self.tokens = float(self._burst()) if rate else 0.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.unlimited_rate = None
+        self.sent = deque()
+        self.lock = threading.Lock()
+
+    def _burst(self) -> float:
+        return self.burst or max(1.0, 2 * self.rate)
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.rate is None:
+                    self._record(now)
+                    return
+                else:
+                    self.tokens = min(self._burst(), self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self._record(now)
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def _record(self, now: float):
+        self.sent.append(now)
+        while self.sent[0] < now - 1.0:
+            self.sent.popleft()
+
+    def _limit(self, factor: float):
+        """Scale the rate down, first setting one from the observed rate if there was no limit."""
+        if self.rate is None:
+            observed = max(self.min_rate, float(len(self.sent)))
+            self.unlimited_rate = observed
+            self.rate = observed
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def on_success(self):
+        with self.lock:
+            if self.rate is None:
+                return
+            self.rate += self.recovery
+            if self.max_rate is not None:
+                self.rate = min(self.max_rate, self.rate)
+            elif self.rate >= self.unlimited_rate:
+                self.rate = None
+
+    def on_near_limit(self):
+        with self.lock:
+            self._limit(0.8)
+
+    def on_throttled(self, retry_after: Optional[float]):
+        with self.lock:
+            self._limit(0.5)
+            self.tokens = 0.0
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+class JiraTraffic:
+    """Shared traffic state for every session that talks to one Jira site."""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_cap: float = 30.0):
+        self.bucket = AdaptiveTokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.lock = threading.Lock()
+        self.in_flight: Dict[tuple, Future] = {}
+        self.counters = {"requests": 0, "throttled": 0, "retried": 0, "coalesced": 0, "failed": 0}
+
+    def install(self, session: Session, pool_size: int = 10):
+        """Route all of a session's requests through this traffic layer."""
+        adapter = TrafficAdapter(self, pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            rate = self.bucket.rate
+            # While unlimited there is no rate to report; `limited` says which state it is in
+            return {**self.counters, "limited": int(rate is not None), "rate": round(rate, 3) if rate else 0.0}
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def send(self, send, request, **kwargs):
+        """Send a prepared request via `send`, coalescing it with an identical GET already in flight."""
+        if request.method != "GET" or kwargs.get("stream") or request.body:
+            return self._send_with_retries(send, request, **kwargs)
+        key = (request.url, request.headers.get("Authorization"), request.headers.get("Accept"))
+        with self.lock:
+            shared = self.in_flight.get(key)
+            if shared is None:
+                shared = self.in_flight[key] = Future()
+                leader = True
+            else:
+                self.counters["coalesced"] += 1
+                leader = False
+        if not leader:
+            response = copy.copy(shared.result())
+            response.request = request
+            return response
+        try:
+            response = self._send_with_retries(send, request, **kwargs)
+            # Read the body now so every waiting caller can be handed a copy
+            response.content
+            shared.set_result(response)
+            return response
+        except BaseException as e:
+            shared.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads out retries from many threads that failed together
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _observe(self, response) -> Optional[float]:
+        """Adapt the bucket to a response's status and rate-limit headers; returns Retry-After."""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if response.status_code == 429 or (response.status_code == 503 and retry_after is not None):
+            self._count("throttled")
+            # Pausing every thread for as long as Jira asks could stall the bot for an hour
+            self.bucket.on_throttled(min(retry_after, self.backoff_cap) if retry_after else retry_after)
+            return retry_after
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        limit = response.headers.get("X-RateLimit-Limit")
+        near_limit = response.headers.get("X-RateLimit-NearLimit", "").lower() == "true"
+        if not near_limit and remaining and limit and remaining.isdigit() and limit.isdigit() and int(limit):
+            near_limit = int(remaining) < int(limit) * 0.1
+        if near_limit:
+            self.bucket.on_near_limit()
+        elif response.status_code < 500:
+            self.bucket.on_success()
+        return retry_after
+
+    def _send_with_retries(self, send, request, **kwargs):
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self._count("requests")
+            try:
+                response = send(request, **kwargs)
+            except (ConnectionError, Timeout):
+                # A POST may have reached Jira before the connection failed, so only idempotent calls retry
+                if not idempotent or attempt >= self.max_retries:
+                    self._count("failed")
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                retry_after = self._observe(response)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                # A 429 means Jira rejected the request unprocessed, so even a POST is safe to resend
+                if (not idempotent and response.status_code != 429) or attempt >= self.max_retries:
+                    self._count("failed")
+                    return response
+                # A long Retry-After is handed back to the caller rather than slept out in a worker slot
+                if retry_after is not None and retry_after > self.backoff_cap:
+                    self._count("failed")
+                    return response
+                delay = max(self._backoff(attempt), retry_after or 0.0)
+                response.close()
+            attempt += 1
+            self._count("retried")
+            time.sleep(delay)
+
+class TrafficAdapter(HTTPAdapter):
+    """HTTPAdapter that sends every request through a JiraTraffic layer."""
+
+    def __init__(self, traffic: JiraTraffic, **kwargs):
+        self.traffic = traffic
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        return self.traffic.send(super().send, request, **kwargs)
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Content-addressed cache for LLM responses, shared by TicketAnalyzer and SimilarityChecker.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class LLMCache:
+    """Two-tier response cache: an in-memory LRU in front of an optional on-disk store."""
+
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.disk_bytes = sum(os.path.getsize(path) for path in self._disk_files())
+
+    @staticmethod
+    def make_key(model: str, temperature, prompt: str) -> str:
+        """Hash the settings that determine a response together with the rendered prompt."""
+        payload = json.dumps({"model": model, "temperature": temperature, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _disk_files(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None on a miss."""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self.memory[key]
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None and not self._expired(entry["created"]):
+                # Touch the file so disk eviction approximates LRU
+                os.utime(path)
+                with self.lock:
+                    self.disk_hits += 1
+                    self._remember(key, entry["created"], entry["response"])
+                return entry["response"]
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, response: str):
+        """Store a response in memory and, if configured, on disk."""
+        created = time.time()
+        with self.lock:
+            self._remember(key, created, response)
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"created": created, "response": response}, f)
+        os.replace(tmp, path)
+        with self.lock:
+            self.disk_bytes += os.path.getsize(path)
+            if self.disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key: str, created: float, response: str):
+        self.memory[key] = (created, response)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        """Drop expired and least recently used files until the disk tier is at 90% of its budget."""
+        files = []
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.9
+        for mtime, size, path in files:
+            if total <= target and not self._expired(mtime):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self.disk_bytes = total
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current sizes."""
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self.memory),
+                "disk_bytes": self.disk_bytes,
+            }
+
+class CachedLLM:
+    """Wraps an LLM so identical prompts are answered from the cache instead of the model."""
+
+    def __init__(self, llm, cache: LLMCache, deterministic: bool = False):
+        if deterministic:
+            # Greedy decoding makes a cached answer the same one the model would give again
+            llm.temperature = 0.0
+            llm.top_k = 1
+        self.llm = llm
+        self.cache = cache
+
+    def invoke(self, prompt: str) -> str:
+        key = LLMCache.make_key(self.llm.model, self.llm.temperature, prompt)
+        response = self.cache.get(key)
+        if response is None:
+            response = self.llm.invoke(prompt)
+            self.cache.put(key, response)
+        return response
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+Condenses raw log text into a compact, severity-ranked summary for root cause prompts.
+
+A single pass over the lines mines Drain-style templates (masking variable tokens and
+merging similar lines), collapses repeats into counts and pulls out exceptions with
+their stack traces. The result is then cut down to a token budget, most severe first.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+MASKS = [
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?\b"), "<TS>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "<NUM>"),
+]
+
+SEVERITIES = [
+    (re.compile(r"\b(FATAL|CRITICAL|SEVERE)\b"), 5),
+    (re.compile(r"\b(ERROR|ERR)\b"), 4),
+    (re.compile(r"\b(WARN|WARNING)\b"), 3),
+    (re.compile(r"\bINFO\b"), 1),
+    (re.compile(r"\b(DEBUG|TRACE)\b"), 0),
+]
+DEFAULT_SEVERITY = 1
+
+EXCEPTION_HEADER = re.compile(r"(Traceback \(most recent call last\)|\b[\w.$]+(?:Exception|Error)\b(?::|$))")
+STACK_FRAME = re.compile(r"^(\s+at\s|\s+File \"|\s+\.\.\. \d+ more|Caused by:|\s+\^|\s{2,}\S)")
+
+WILDCARD = "<*>"
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def severity_of(line: str) -> int:
+    for pattern, level in SEVERITIES:
+        if pattern.search(line):
+            return level
+    return DEFAULT_SEVERITY
+
+class _Cluster:
+    __slots__ = ("template", "example", "count", "severity", "first_seen")
+
+    def __init__(self, tokens: List[str], example: str, severity: int, first_seen: int):
+        self.template = tokens
+        self.example = example
+        self.count = 1
+        self.severity = severity
+        self.first_seen = first_seen
+
+    def similarity(self, tokens: List[str]) -> float:
+        same = sum(1 for a, b in zip(self.template, tokens) if a == b or a == WILDCARD)
+        return same / len(tokens)
+
+    def merge(self, tokens: List[str], severity: int):
+        self.template = [a if a == b else WILDCARD for a, b in zip(self.template, tokens)]
+        self.count += 1
+        self.severity = max(self.severity, severity)
+
+class _ExceptionBlock:
+    __slots__ = ("lines", "count", "first_seen")
+
+    def __init__(self, header: str, first_seen: int):
+        self.lines = [header]
+        self.count = 1
+        self.first_seen = first_seen
+
+class LogCondenser:
+    def __init__(self, token_budget: int = 1500, similarity_threshold: float = 0.5,
+                 max_clusters_per_group: int = 64, max_frames: int = 12):
+        self.token_budget = token_budget
+        self.similarity_threshold = similarity_threshold
+        self.max_clusters_per_group = max_clusters_per_group
+        self.max_frames = max_frames
+
+    @staticmethod
+    def _mask(line: str) -> List[str]:
+        for pattern, replacement in MASKS:
+            line = pattern.sub(replacement, line)
+        return line.split()
+
+    def _add_line(self, groups: Dict, line: str, index: int):
+        tokens = self._mask(line)
+        if not tokens:
+            return
+        severity = severity_of(line)
+        # Drain's fixed-depth tree reduced to its first two levels: token count, then first token
+        group = groups.setdefault((len(tokens), tokens[0]), [])
+        best: Optional[_Cluster] = None
+        best_score = 0.0
+        for cluster in group:
+            score = cluster.similarity(tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+        if best is not None and best_score >= self.similarity_threshold:
+            best.merge(tokens, severity)
+        elif len(group) < self.max_clusters_per_group:
+            group.append(_Cluster(tokens, line, severity, index))
+        else:
+            # Group is saturated; fold into the closest template rather than growing without bound
+            (best or group[0]).merge(tokens, severity)
+
+    def condense(self, text: str) -> str:
+        """Return a condensed view of `text` that fits the token budget."""
+        if not text or estimate_tokens(text) <= self.token_budget:
+            return text
+
+        groups: Dict = {}
+        exceptions: Dict[str, _ExceptionBlock] = {}
+        current: Optional[_ExceptionBlock] = None
+        current_lines: List[str] = []
+
+        def close_exception():
+            if current is None:
+                return
+            signature = "\n".join(self._mask(" ".join(current_lines[:3])))
+            existing = exceptions.get(signature)
+            if existing is not None:
+                existing.count += 1
+            else:
+                current.lines = current_lines[:self.max_frames + 1]
+                exceptions[signature] = current
+
+        total_lines = 0
+        for index, raw_line in enumerate(text.splitlines()):
+            total_lines += 1
+            line = raw_line.rstrip()
+            if not line:
+                continue
+            if current is not None and STACK_FRAME.match(line):
+                if len(current_lines) <= self.max_frames:
+                    current_lines.append(line)
+                continue
+            if current is not None and len(current_lines) > 1 and current_lines[0].startswith("Traceback") \
+                    and EXCEPTION_HEADER.search(line):
+                # Python tracebacks end with the exception line rather than starting with it
+                current_lines.append(line)
+                close_exception()
+                current = None
+                continue
+            if EXCEPTION_HEADER.search(line):
+                close_exception()
+                current = _ExceptionBlock(line, index)
+                current_lines = [line]
+                continue
+            close_exception()
+            current = None
+            self._add_line(groups, line, index)
+        close_exception()
+
+        return self._render(groups, exceptions, total_lines)
+
+    def _render(self, groups: Dict, exceptions: Dict[str, _ExceptionBlock], total_lines: int) -> str:
+        clusters = sorted(
+            (cluster for group in groups.values() for cluster in group),
+            key=lambda c: (-c.severity, c.first_seen)
+        )
+        blocks = sorted(exceptions.values(), key=lambda b: b.first_seen)
+
+        sections = []
+        used = estimate_tokens(f"[Condensed from {total_lines} log lines]")
+        omitted = 0
+        for block in blocks:
+            rendered = "\n".join(block.lines)
+            if block.count > 1:
+                rendered = f"[{block.count}x] " + rendered
+            cost = estimate_tokens(rendered)
+            if used + cost > self.token_budget:
+                omitted += 1
+                continue
+            sections.append(rendered)
+            used += cost
+
+        for cluster in clusters:
+            if cluster.count > 1:
+                rendered = f"[{cluster.count}x] {' '.join(cluster.template)}"
+            else:
+                rendered = cluster.example
+            cost = estimate_tokens(rendered)
+            if used + cost > self.token_budget:
+                omitted += 1
+                continue
+            sections.append(rendered)
+            used += cost
+
+        header = f"[Condensed from {total_lines} log lines"
+        header += f"; {omitted} lower-priority entries omitted]" if omitted else "]"
+        return header + "\n" + "\n".join(sections)
\ No newline at end of file
@@ -4,17 +4,110 @@ Main entry point for the Jira AI Bot.
 
 import os
 from jira_agent import JiraAIBot
+from ticket_scheduler import parse_class_seconds
 
 def main():
     JIRA_URL = os.getenv("JIRA_URL", "https://your-jira-instance.atlassian.net")
     USERNAME = os.getenv("JIRA_USERNAME", "your_email@example.com")
     API_TOKEN = os.getenv("JIRA_API_TOKEN", "your_api_token")
     JQL_FILTER = os.getenv("JQL_FILTER", 'project = YOUR_PROJECT AND issuetype in (Bug, Support) AND status = "To Do"')
+    EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL")
+    SIMILARITY_LLM_RERANK = os.getenv("SIMILARITY_LLM_RERANK", "true").lower() == "true"
+    STORE_PATH = os.getenv("STORE_PATH")
+    PIPELINE = os.getenv("PIPELINE_ENABLED", "false").lower() == "true"
+    MAX_IN_FLIGHT = int(os.getenv("PIPELINE_MAX_IN_FLIGHT", "8"))
+    JIRA_CONCURRENCY = int(os.getenv("PIPELINE_JIRA_CONCURRENCY", "4"))
+    LLM_CONCURRENCY = int(os.getenv("PIPELINE_LLM_CONCURRENCY", "1"))
+    INCREMENTAL_POLL = os.getenv("INCREMENTAL_POLL", "false").lower() == "true"
+    WATERMARK_PATH = os.getenv("WATERMARK_PATH")
+    BOT_LABEL = os.getenv("BOT_LABEL")
+    LLM_CACHE = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR")
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    LLM_CACHE_DETERMINISTIC = os.getenv("LLM_CACHE_DETERMINISTIC", "false").lower() == "true"
+    ATTACHMENT_WORKERS = int(os.getenv("ATTACHMENT_WORKERS", "4"))
+    ATTACHMENT_BYTE_BUDGET = int(os.getenv("ATTACHMENT_BYTE_BUDGET", str(256 * 1024)))
+    LOG_TOKEN_BUDGET = int(os.getenv("LOG_TOKEN_BUDGET", "1500"))
+    LLM_BATCHING = os.getenv("LLM_BATCHING_ENABLED", "false").lower() == "true"
+    LLM_PARALLELISM = int(os.getenv("LLM_PARALLELISM", "4"))
+    LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "8"))
+    LLM_BATCH_WINDOW = float(os.getenv("LLM_BATCH_WINDOW_SECONDS", "0.02"))
+    TRIAGE_MODEL_PATH = os.getenv("TRIAGE_MODEL_PATH")
+    TRIAGE_THRESHOLD = float(os.getenv("TRIAGE_THRESHOLD", "0.6"))
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) or None
+    PROFILE_DIR = os.getenv("PROFILE_DIR")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "0")) or None
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+    WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+    RECONCILE_INTERVAL = int(os.getenv("RECONCILE_INTERVAL_SECONDS", "900"))
+    LEASE_STORE = os.getenv("LEASE_STORE")
+    WORKER_ID = os.getenv("WORKER_ID")
+    LEASE_SECONDS = float(os.getenv("LEASE_SECONDS", "600"))
+    JIRA_MAX_REQUESTS_PER_SECOND = float(os.getenv("JIRA_MAX_REQUESTS_PER_SECOND", "0")) or None
+    JIRA_MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", "4"))
+    SCHEDULER = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+    PRIORITY_HEAD_START = parse_class_seconds(os.getenv("SCHEDULER_PRIORITY_HEAD_START")) or None
+    SCHEDULER_DEADLINES = parse_class_seconds(os.getenv("SCHEDULER_DEADLINES"))
+    LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "30m")
+    LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() == "true"
+    BACKFILL_JQL = os.getenv("BACKFILL_JQL")
+    BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "100"))
+    BACKFILL_MAX_REQUESTS_PER_MINUTE = float(os.getenv("BACKFILL_MAX_REQUESTS_PER_MINUTE", "30"))
+    BACKFILL_CHECKPOINT_PATH = os.getenv("BACKFILL_CHECKPOINT_PATH")
 
-    bot = JiraAIBot(jira_url=JIRA_URL, username=USERNAME, api_token=API_TOKEN, jql_filter=JQL_FILTER)
+    bot = JiraAIBot(
+        jira_url=JIRA_URL,
+        username=USERNAME,
+        api_token=API_TOKEN,
+        jql_filter=JQL_FILTER,
+        embed_model=EMBED_MODEL,
+        similarity_llm_rerank=SIMILARITY_LLM_RERANK,
+        store_path=STORE_PATH,
+        pipeline=PIPELINE,
+        max_in_flight=MAX_IN_FLIGHT,
+        jira_concurrency=JIRA_CONCURRENCY,
+        llm_concurrency=LLM_CONCURRENCY,
+        incremental_poll=INCREMENTAL_POLL,
+        watermark_path=WATERMARK_PATH,
+        bot_label=BOT_LABEL,
+        llm_cache=LLM_CACHE,
+        llm_cache_dir=LLM_CACHE_DIR,
+        llm_cache_ttl=LLM_CACHE_TTL,
+        llm_cache_deterministic=LLM_CACHE_DETERMINISTIC,
+        attachment_workers=ATTACHMENT_WORKERS,
+        attachment_byte_budget=ATTACHMENT_BYTE_BUDGET,
+        log_token_budget=LOG_TOKEN_BUDGET,
+        llm_batching=LLM_BATCHING,
+        llm_parallelism=LLM_PARALLELISM,
+        llm_batch_size=LLM_BATCH_SIZE,
+        llm_batch_window=LLM_BATCH_WINDOW,
+        triage_model_path=TRIAGE_MODEL_PATH,
+        triage_threshold=TRIAGE_THRESHOLD,
+        metrics_port=METRICS_PORT,
+        profile_dir=PROFILE_DIR,
+        lease_store=LEASE_STORE,
+        worker_id=WORKER_ID,
+        lease_seconds=LEASE_SECONDS,
+        jira_max_requests_per_second=JIRA_MAX_REQUESTS_PER_SECOND,
+        jira_max_retries=JIRA_MAX_RETRIES,
+        scheduler=SCHEDULER,
+        priority_head_start=PRIORITY_HEAD_START,
+        scheduler_deadlines=SCHEDULER_DEADLINES,
+        llm_keep_alive=LLM_KEEP_ALIVE,
+        llm_warmup=LLM_WARMUP,
+        backfill_jql=BACKFILL_JQL,
+        backfill_batch_size=BACKFILL_BATCH_SIZE,
+        backfill_max_requests_per_minute=BACKFILL_MAX_REQUESTS_PER_MINUTE,
+        backfill_checkpoint_path=BACKFILL_CHECKPOINT_PATH
+    )
 
-    # Start polling for new tickets
-    bot.run(poll_interval=60)
+    if WEBHOOK_PORT:
+        # Process tickets as Jira webhooks arrive, reconciling with a slow poll
+        bot.run_webhooks(port=WEBHOOK_PORT, secret=WEBHOOK_SECRET, reconcile_interval=RECONCILE_INTERVAL,
+                         queue_size=WEBHOOK_QUEUE_SIZE)
+    else:
+        # Start polling for new tickets
+        bot.run(poll_interval=60)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,321 @@
+"""
+Per-stage latency and throughput instrumentation for the Jira AI Bot.
+
+Stage spans feed Prometheus-style histograms, counters and gauges that are served
+from a lightweight local HTTP `/metrics` endpoint. Every processed ticket also gets
+one structured JSON log line. `/profile` arms a sampling profiler of every thread for the next
+poll cycle.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key: Tuple, extra: Optional[Tuple] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler for every thread in the process. cProfile only sees the thread
+    that enables it, which misses the pipeline and attachment workers; this samples all thread
+    stacks every `interval` seconds from a background thread, so blocking I/O shows up too.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[(names.get(ident, str(ident)),) + tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def report(self, limit: int = 25) -> str:
+        """The functions seen most often, by samples on top of the stack and anywhere in it."""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            # A recursive function counts once per sample
+            for function in set(stack[1:]):
+                total[function] += count
+        threads = sorted({stack[0] for stack in self.stacks})
+        lines = [f"{self.samples} samples every {self.interval * 1000:.0f} ms across {len(threads)} threads: "
+                 + ", ".join(threads),
+                 f"{'self':>8} {'total':>8}  function (seconds of thread time, summed over threads)"]
+        for function, count in total.most_common(limit):
+            lines.append(f"{own[function] * self.interval:8.2f} {count * self.interval:8.2f}  {function}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Write collapsed stacks (`thread;outer;...;inner count`), the input format of flame graph tools."""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(";".join(stack) + f" {count}\n")
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+class Metrics:
+    def __init__(self, namespace: str = "jira_bot", profile_dir: Optional[str] = None):
+        self.namespace = namespace
+        self.profile_dir = profile_dir
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Dict[Tuple, _Histogram]] = {}
+        self.histogram_buckets: Dict[str, tuple] = {}
+        self.counters: Dict[str, Dict[Tuple, float]] = {}
+        self.gauges: Dict[str, Dict[Tuple, float]] = {}
+        self.collectors: Dict[str, Callable[[], Dict]] = {}
+        self.profile_requested = threading.Event()
+
+    # Recording
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        with self.lock:
+            self.histogram_buckets.setdefault(name, buckets)
+            series = self.histograms.setdefault(name, {})
+            key = _label_key(labels)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.histogram_buckets[name])
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict]):
+        """Export the numeric values of `collect()` as gauges named `<prefix>_<key>` at scrape time."""
+        self.collectors[prefix] = collect
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """Time a block into the stage latency histogram."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=stage, **labels)
+
+    def ticket_trace(self, ticket: Dict) -> "TicketTrace":
+        return TicketTrace(self, ticket)
+
+    # Exposition
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, series in self.counters.items():
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {full} counter")
+                lines += [f"{full}{_format_labels(key)} {value}" for key, value in series.items()]
+            for name, series in self.gauges.items():
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {full} gauge")
+                lines += [f"{full}{_format_labels(key)} {value}" for key, value in series.items()]
+            for name, series in self.histograms.items():
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {full} histogram")
+                for key, histogram in series.items():
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{full}_bucket{_format_labels(key, ('le', bound))} {count}")
+                    lines.append(f"{full}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {histogram.total}")
+                    lines.append(f"{full}_count{_format_labels(key)} {histogram.count}")
+        for prefix, collect in list(self.collectors.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"Error collecting {prefix} metrics: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    full = f"{self.namespace}_{prefix}_{key}"
+                    lines.append(f"# TYPE {full} gauge")
+                    lines.append(f"{full} {value}")
+        return "\n".join(lines) + "\n"
+
+    # Profiling
+
+    def request_profile(self):
+        """Profile the next poll cycle."""
+        self.profile_requested.set()
+
+    @contextmanager
+    def maybe_profile(self):
+        """Sample every thread's stack during the block if a profile was requested, then report and save it."""
+        if not self.profile_requested.is_set():
+            yield
+            return
+        self.profile_requested.clear()
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            print(sampler.report())
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"poll-{int(time.time())}.folded")
+                sampler.dump(path)
+                print(f"Saved poll profile to {path}")
+
+class TicketTrace:
+    """Collects one ticket's stage timings and emits them as a JSON log line."""
+
+    def __init__(self, metrics: Metrics, ticket: Dict):
+        self.metrics = metrics
+        self.ticket_id = ticket["ticket_id"]
+        self.ticket_type = ticket.get("issue_type", "Unknown")
+        self.stages: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str, fn: Callable) -> Callable:
+        """Wrap `fn` so its execution time is recorded as `stage`, wherever it runs."""
+        def wrapper(*args, **kwargs):
+            with self.span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def _record(self, stage: str, seconds: float):
+        self.stages[stage] = round(seconds, 4)
+        self.metrics.observe("stage_seconds", seconds, stage=stage, ticket_type=self.ticket_type)
+
+    def finish(self, status: str, log: bool = True, **fields):
+        total = time.perf_counter() - self.started
+        self.metrics.inc("tickets_total", status=status, ticket_type=self.ticket_type)
+        if status == "commented":
+            self.metrics.observe("ticket_seconds", total, ticket_type=self.ticket_type)
+        if not log:
+            return
+        print(json.dumps({
+            "event": "ticket",
+            "ticket_id": self.ticket_id,
+            "ticket_type": self.ticket_type,
+            "status": status,
+            "total_seconds": round(total, 4),
+            "stages": self.stages,
+            **fields
+        }))
+
+class MeteredLLM:
+    """Records prompt and response sizes for an LLM used in a given stage."""
+
+    def __init__(self, llm, metrics: Metrics, stage: str):
+        self.llm = llm
+        self.metrics = metrics
+        self.stage = stage
+
+    def invoke(self, prompt: str) -> str:
+        self.metrics.set_gauge("prompt_chars", len(prompt), stage=self.stage)
+        self.metrics.observe("prompt_chars_distribution", len(prompt), buckets=SIZE_BUCKETS, stage=self.stage)
+        response = self.llm.invoke(prompt)
+        self.metrics.set_gauge("response_chars", len(response), stage=self.stage)
+        self.metrics.observe("response_chars_distribution", len(response), buckets=SIZE_BUCKETS, stage=self.stage)
+        return response
+
+class MetricsServer:
+    """Serves `/metrics` and `/profile` on a background thread."""
+
+    def __init__(self, metrics: Metrics, port: int = 9100, host: str = "0.0.0.0"):
+        handler = self._make_handler(metrics)
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+
+    @staticmethod
+    def _make_handler(metrics: Metrics):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] == "/metrics":
+                    self._reply(200, metrics.render(), "text/plain; version=0.0.4")
+                elif self.path.split("?")[0] == "/profile":
+                    metrics.request_profile()
+                    self._reply(202, "Profiling the next poll cycle\n", "text/plain")
+                else:
+                    self._reply(404, "Not found\n", "text/plain")
+
+            do_POST = do_GET
+
+            def _reply(self, status: int, body: str, content_type: str):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread.start()
+        print(f"Serving metrics on port {self.server.server_address[1]}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
\ No newline at end of file
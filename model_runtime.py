@@ -0,0 +1,119 @@
+"""
+Shared Ollama model runtime for ticket analysis and similarity reranking.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Union
+
+class ModelRuntime:
+    """
+    One generation model, client and HTTP connection pool for every stage that prompts the LLM.
+
+    `langchain_ollama` is imported on first use. `start()` does that import in the background,
+    polls the Ollama server until the model is available and sends a warmup request, so the
+    model is resident before the first ticket arrives. `keep_alive` keeps it loaded between polls.
+    """
+
+    def __init__(self, model: str = "gemma3:1b", temperature: float = 0.7,
+                 keep_alive: Union[str, int, None] = "30m", base_url: Optional[str] = None,
+                 pool_size: int = 4, ready_timeout: float = 600):
+        self._model = model
+        self.keep_alive = keep_alive
+        # None lets the Ollama client read OLLAMA_HOST
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.ready_timeout = ready_timeout
+        self.settings = {"temperature": temperature, "top_k": None}
+        self.llm = None
+        self.lock = threading.Lock()
+        self.thread = None
+        self.started = threading.Event()
+        self.ready_seconds = None
+        self.warmup_seconds = None
+
+    # Same interface as OllamaLLM, so CachedLLM keys and deterministic mode keep working
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def temperature(self):
+        return self.settings["temperature"]
+
+    @temperature.setter
+    def temperature(self, value):
+        self._set("temperature", value)
+
+    @property
+    def top_k(self):
+        return self.settings["top_k"]
+
+    @top_k.setter
+    def top_k(self, value):
+        self._set("top_k", value)
+
+    def _set(self, name: str, value):
+        with self.lock:
+            self.settings[name] = value
+            if self.llm is not None:
+                setattr(self.llm, name, value)
+
+    def _get_llm(self):
+        with self.lock:
+            if self.llm is None:
+                import httpx
+                from langchain_ollama import OllamaLLM
+                limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                self.llm = OllamaLLM(model=self._model, keep_alive=self.keep_alive, base_url=self.base_url,
+                                     client_kwargs={"limits": limits}, **self.settings)
+            return self.llm
+
+    def start(self):
+        """Prepare the model on a background thread; the first `invoke` waits for it."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._prepare, name="model-runtime", daemon=True)
+            self.thread.start()
+
+    def _wait_until_ready(self, started: float) -> bool:
+        from ollama import Client
+        client = Client(host=self.base_url)
+        while True:
+            try:
+                names = {model.model for model in client.list().models}
+                if self._model in names or f"{self._model}:latest" in names:
+                    return True
+            except Exception:
+                pass
+            if time.monotonic() - started > self.ready_timeout:
+                return False
+            time.sleep(0.5)
+
+    def _prepare(self):
+        started = time.monotonic()
+        try:
+            llm = self._get_llm()
+            if not self._wait_until_ready(started):
+                print(f"Model {self._model} not available after {self.ready_timeout:.0f}s, continuing without warmup")
+                return
+            self.ready_seconds = time.monotonic() - started
+            # An empty prompt makes Ollama load the model without generating anything
+            llm.invoke("")
+            self.warmup_seconds = time.monotonic() - started - self.ready_seconds
+            print(f"Model {self._model} ready in {self.ready_seconds:.1f}s, warmed up in {self.warmup_seconds:.1f}s")
+        except Exception as e:
+            print(f"Error warming up model {self._model}: {e}")
+        finally:
+            self.started.set()
+
+    def invoke(self, prompt: str) -> str:
+        if self.thread is not None:
+            self.started.wait()
+        return self._get_llm().invoke(prompt)
+
+    def stats(self) -> Dict:
+        return {
+            "ready": 1 if self.ready_seconds is not None else 0,
+            "ready_seconds": self.ready_seconds or 0.0,
+            "warmup_seconds": self.warmup_seconds or 0.0,
+        }
\ No newline at end of file
@@ -1,39 +1,110 @@
 """
-Handles similarity checks for Jira tickets using gemma3:1b LLM.
+Handles similarity checks for Jira tickets using a vector index, optionally reranked by gemma3:1b LLM.
 """
 
-from typing import List, Dict
+import threading
+from typing import List, Dict, Optional
 from agent_template import get_similarity_check_prompt, format_similar_tickets
-from langchain_ollama import OllamaLLM
+from llm_cache import CachedLLM, LLMCache
+from model_runtime import ModelRuntime
+from vector_index import VectorIndex, get_default_embedder
 
 class SimilarityChecker:
-    def __init__(self):
-        self.llm = OllamaLLM(model="gemma3:1b", temperature=0.7)
-        self.tickets = []
+    def __init__(self, embedder=None, use_llm_rerank: bool = True, top_k: int = 5, min_similarity: float = 0.3,
+                 store=None, llm_cache: LLMCache = None, deterministic: bool = False, llm=None):
+        self.embedder = embedder or get_default_embedder()
+        # A persistent TicketStore doubles as the index and the ticket metadata
+        self.store = store
+        self.index = store if store is not None else VectorIndex(self.embedder.dim)
+        self.use_llm_rerank = use_llm_rerank
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.llm = None
+        if use_llm_rerank:
+            self.llm = llm or ModelRuntime()
+            if llm_cache:
+                self.llm = CachedLLM(self.llm, llm_cache, deterministic)
+        self.tickets = store.tickets if store is not None else []
+        # Guards the index so tickets can be added and searched from pipeline threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ticket_text(ticket: Dict) -> str:
+        return f"{ticket.get('summary', '')}\n{ticket.get('description', '')}"
 
     def add_ticket(self, ticket: Dict):
-        """Add a ticket to the internal store for similarity checks."""
-        self.tickets.append(ticket)
+        """Embed a ticket once and add it to the index for similarity checks."""
+        vector = self.embedder.embed(self._ticket_text(ticket))
+        with self._lock:
+            if self.store is not None:
+                self.store.add(ticket["ticket_id"], vector, ticket)
+                return
+            self._add_to_index(ticket, vector)
+
+    def add_tickets(self, tickets: List[Dict]):
+        """Embed a batch of tickets together and add them to the index in one write."""
+        if not tickets:
+            return
+        vectors = self.embedder.embed_many([self._ticket_text(ticket) for ticket in tickets])
+        with self._lock:
+            if self.store is not None:
+                self.store.add_many((ticket["ticket_id"], vector, ticket) for ticket, vector in zip(tickets, vectors))
+                return
+            for ticket, vector in zip(tickets, vectors):
+                self._add_to_index(ticket, vector)
+
+    def _add_to_index(self, ticket: Dict, vector):
+        row = self.index.add(ticket["ticket_id"], vector)
+        if row == len(self.tickets):
+            self.tickets.append(ticket)
+        else:
+            self.tickets[row] = ticket
 
     def find_similar_tickets(self, new_ticket: Dict, jira_base_url: str) -> List[Dict]:
         """
-        Find similar tickets using gemma3:1b LLM.
+        Find similar tickets with a cosine top-k over the vector index,
+        reranking only the top candidates with gemma3:1b LLM when enabled.
         """
         new_ticket_id = new_ticket.get("ticket_id")
-        new_summary = new_ticket.get("summary", "")
-        new_description = new_ticket.get("description", "")
+        with self._lock:
+            row = self.index.rows.get(new_ticket_id)
+            query = self.index.vectors[row].copy() if row is not None else None
+        if query is None:
+            query = self.embedder.embed(self._ticket_text(new_ticket))
+
+        candidates = []
+        with self._lock:
+            for ticket_id, similarity in self.index.search(query, self.top_k, exclude=new_ticket_id):
+                if similarity < self.min_similarity:
+                    continue
+                ticket = self.tickets[self.index.rows[ticket_id]]
+                candidates.append({
+                    "ticket_id": ticket_id,
+                    "summary": ticket.get("summary", ""),
+                    "description": ticket.get("description", ""),
+                    "similarity": round(similarity, 4)
+                })
+
+        reranked = self._rerank_with_llm(new_ticket, candidates) if candidates and self.llm is not None else None
+        if reranked is not None:
+            return reranked
+        return [{k: c[k] for k in ("ticket_id", "summary", "similarity")} for c in candidates]
+
+    def _rerank_with_llm(self, new_ticket: Dict, candidates: List[Dict]) -> Optional[List[Dict]]:
+        """Ask the LLM to rerank the candidates; returns None when its answer is unusable."""
+        new_ticket_id = new_ticket.get("ticket_id")
+        candidate_ids = {c["ticket_id"] for c in candidates}
 
-        # Prepare existing tickets data for LLM prompt, excluding the new ticket
+        # Only the top candidates go into the prompt, never the whole store
         existing_tickets_data = "; ".join(
-            f"{ticket['ticket_id']}: Summary - '{ticket['summary']}', Description - '{ticket['description']}'"
-            for ticket in self.tickets if ticket['ticket_id'] != new_ticket_id
+            f"{c['ticket_id']}: Summary - '{c['summary']}', Description - '{c['description']}'"
+            for c in candidates
         )
 
-        # Use LLM for similarity check
         prompt = get_similarity_check_prompt(
             new_ticket_id=new_ticket_id,
-            new_ticket_summary=new_summary,
-            new_ticket_description=new_description,
+            new_ticket_summary=new_ticket.get("summary", ""),
+            new_ticket_description=new_ticket.get("description", ""),
             existing_tickets_data=existing_tickets_data
         )
         try:
@@ -41,6 +112,8 @@ class SimilarityChecker:
             # Parse LLM response
             if response.startswith("http"):
                 ticket_id = response.split("/")[-1]
+                if ticket_id not in candidate_ids:
+                    return None
                 return [{
                     "ticket_id": ticket_id,
                     "summary": "Highly similar ticket",
@@ -56,6 +129,8 @@ class SimilarityChecker:
                             summary_score = parts[1].split("(Similarity:")
                             summary = summary_score[0].strip()
                             similarity = float(summary_score[1].strip(")").strip())
+                            if ticket_id not in candidate_ids:
+                                continue
                             similar_tickets.append({
                                 "ticket_id": ticket_id,
                                 "summary": summary,
@@ -64,7 +139,7 @@ class SimilarityChecker:
                         except (IndexError, ValueError) as e:
                             print(f"Error parsing similarity response: {line}, {e}")
                             continue
-                return similar_tickets
+                return similar_tickets or None
         except Exception as e:
-            print(f"Error in similarity check for ticket {new_ticket_id}: {e}")
-            return []
\ No newline at end of file
+            print(f"Error in similarity rerank for ticket {new_ticket_id}: {e}")
+            return None
\ No newline at end of file
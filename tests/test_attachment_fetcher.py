@@ -0,0 +1,98 @@
+"""
+Decompression of `.gz` and `.zip` attachments stays within its caps, however well they compress.
+"""
+
+import gzip
+import io
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+pytest.importorskip("requests")
+
+from attachment_fetcher import AttachmentFetcher, TRUNCATED_NOTE
+
+LOG = b"".join(b"line %d\n" % i for i in range(20000))
+BOMB_BYTES = 64 * 1024 * 1024
+CAP = 4 * 1024 * 1024
+
+def zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+FILES = {
+    "/app.log.gz": gzip.compress(LOG),
+    "/bomb.log.gz": gzip.compress(bytes(BOMB_BYTES)),
+    "/app.zip": zip_bytes([("app.log", LOG)]),
+    "/bomb.zip": zip_bytes([("bomb.log", bytes(BOMB_BYTES)), ("app.log", LOG)]),
+}
+
+@pytest.fixture(scope="module")
+def base_url():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = FILES[self.path]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def fetcher():
+    fetcher = AttachmentFetcher("user", "token", byte_budget=8192, max_decompressed_bytes=CAP)
+    yield fetcher
+    fetcher.close()
+
+def attachment(base_url, name):
+    return {"filename": name.lstrip("/"), "url": base_url + name, "size": len(FILES[name])}
+
+@pytest.mark.parametrize("name", ["/app.log.gz", "/app.zip"])
+def test_small_archive_keeps_head_and_tail(base_url, fetcher, name):
+    text, stats = fetcher.fetch("BENCH-1", [attachment(base_url, name)])
+    assert text.startswith("line 0\n") and text.endswith("line 19999")
+    assert TRUNCATED_NOTE.strip() not in text
+    # Content counters are in decompressed bytes, the download in compressed ones
+    assert stats["bytes_read"] + stats["bytes_skipped"] == len(LOG)
+    assert stats["bytes_downloaded"] == len(FILES[name])
+
+@pytest.mark.parametrize("name", ["/bomb.log.gz", "/bomb.zip"])
+def test_decompression_stops_at_the_cap(base_url, fetcher, name):
+    text, stats = fetcher.fetch("BENCH-1", [attachment(base_url, name)])
+    assert TRUNCATED_NOTE.strip() in text
+    assert stats["errors"] == 0
+    assert stats["bytes_read"] <= 8192
+    if name.endswith(".gz"):
+        assert stats["bytes_read"] + stats["bytes_skipped"] == CAP
+
+def test_zip_member_with_suspicious_ratio_is_read_to_its_head_only(base_url):
+    fetcher = AttachmentFetcher("user", "token", byte_budget=8192)
+    try:
+        text, stats = fetcher.fetch("BENCH-1", [attachment(base_url, "/bomb.zip")])
+    finally:
+        fetcher.close()
+    # The bomb member stops after its head; the ordinary member next to it is read in full
+    assert text.count(TRUNCATED_NOTE.strip()) == 1
+    assert text.rstrip().endswith("line 19999")
+    assert stats["bytes_read"] + stats["bytes_skipped"] == BOMB_BYTES + len(LOG)
+
+def test_head_only_gzip_stops_after_the_head(base_url):
+    fetcher = AttachmentFetcher("user", "token", byte_budget=4096, head_ratio=1.0, chunk_size=1024)
+    try:
+        text, stats = fetcher.fetch("BENCH-1", [attachment(base_url, "/bomb.log.gz")])
+    finally:
+        fetcher.close()
+    assert stats["bytes_read"] == 4096
+    assert stats["bytes_downloaded"] < len(FILES["/bomb.log.gz"])
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+The backfill runs inside the live bot, sharing its single store writer, while tickets are processed.
+"""
+
+import contextlib
+import io
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("langchain_ollama")
+
+from benchmark import FakeJiraServer, FakeOllamaServer
+from jira_agent import JiraAIBot
+
+def test_backfill_runs_alongside_polling(tmp_path, monkeypatch):
+    jira, ollama = FakeJiraServer(attachments_per_issue=0), FakeOllamaServer(latency=0)
+    jira.start()
+    ollama.start()
+    monkeypatch.setenv("OLLAMA_HOST", ollama.url)
+    jira.reset(30)
+    bot = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot = JiraAIBot(jira.url, "user", "token", "project = BENCH", similarity_llm_rerank=False,
+                            store_path=str(tmp_path / "store"), llm_warmup=False, backfill_jql="project = BENCH",
+                            backfill_batch_size=7, backfill_max_requests_per_minute=0)
+            thread = bot.backfill.run_in_background()
+            bot.process_new_tickets()
+            thread.join(timeout=60)
+        assert bot.backfill.complete
+        assert bot.backfill.stats() == {"ingested": 30, "complete": 1}
+        assert len(bot.ticket_store) == 30
+        assert bot.ticket_store.processed_ids() == {f"BENCH-{n}" for n in range(1, 31)}
+        assert all(len(jira.issues[f"BENCH-{n}"]["comments"]) == 1 for n in range(1, 31))
+    finally:
+        if bot:
+            bot.ticket_store.close()
+        jira.stop()
+        ollama.stop()
\ No newline at end of file
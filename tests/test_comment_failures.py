@@ -0,0 +1,93 @@
+"""
+A comment that fails to post must leave the ticket retryable: not processed, its lease not
+done for other workers, and the incremental watermark not moved past it.
+"""
+
+import contextlib
+import io
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("langchain_ollama")
+
+from benchmark import FakeJiraServer, FakeOllamaServer
+from jira_agent import JiraAIBot
+
+TICKET_IDS = ["BENCH-1", "BENCH-2", "BENCH-3"]
+
+@pytest.fixture(scope="module")
+def servers():
+    jira, ollama = FakeJiraServer(attachments_per_issue=0), FakeOllamaServer(latency=0)
+    jira.start()
+    ollama.start()
+    yield jira, ollama
+    jira.stop()
+    ollama.stop()
+
+@pytest.fixture(params=[False, True], ids=["sequential", "pipeline"])
+def bot(request, servers, tmp_path, monkeypatch):
+    jira, ollama = servers
+    jira.reset(len(TICKET_IDS))
+    monkeypatch.setenv("OLLAMA_HOST", ollama.url)
+    bot = JiraAIBot(jira.url, "user", "token", "project = BENCH", similarity_llm_rerank=False,
+                    store_path=str(tmp_path / "store"), pipeline=request.param,
+                    lease_store=str(tmp_path / "leases.db"), incremental_poll=True,
+                    watermark_path=str(tmp_path / "watermark.json"), llm_warmup=False)
+    yield bot
+    if bot.pipeline:
+        bot.pipeline.shutdown()
+    if bot.bulk_pipeline and bot.bulk_pipeline is not bot.pipeline:
+        bot.bulk_pipeline.shutdown()
+    bot.coordinator.close()
+    bot.ticket_store.close()
+
+def fail_comments_on(bot, keys):
+    """Make the comment POST fail for `keys` (all tickets if None); returns the original method."""
+    post_comment = bot.jira_client.jira.add_comment
+
+    def add_comment(issue, *args, **kwargs):
+        if keys is None or str(issue) in keys:
+            raise RuntimeError("comment POST failed")
+        return post_comment(issue, *args, **kwargs)
+
+    bot.jira_client.jira.add_comment = add_comment
+    return post_comment
+
+def poll(bot):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot.process_new_tickets()
+
+def test_failed_comment_is_retried(servers, bot):
+    jira, _ = servers
+    post_comment = fail_comments_on(bot, None)
+    poll(bot)
+    assert bot.ticket_store.processed_ids() == set()
+    assert bot.coordinator.store.done_ids(TICKET_IDS) == set()
+    assert bot.poller.watermark is None or bot.poller.watermark["key"] not in TICKET_IDS
+    assert all(not jira.issues[key]["comments"] for key in TICKET_IDS)
+
+    bot.jira_client.jira.add_comment = post_comment
+    poll(bot)
+    assert bot.ticket_store.processed_ids() == set(TICKET_IDS)
+    assert bot.coordinator.store.done_ids(TICKET_IDS) == set(TICKET_IDS)
+    assert all(len(jira.issues[key]["comments"]) == 1 for key in TICKET_IDS)
+
+def test_one_failing_ticket_does_not_block_the_rest(servers, bot):
+    jira, _ = servers
+    fail_comments_on(bot, {"BENCH-1"})
+    for _ in range(3):
+        poll(bot)
+    assert not jira.issues["BENCH-1"]["comments"]
+    assert all(len(jira.issues[key]["comments"]) == 1 for key in TICKET_IDS[1:])
+    assert bot.ticket_store.processed_ids() == set(TICKET_IDS[1:])
+    # BENCH-1 sorts first, so the watermark waits for it
+    assert bot.poller.watermark is None
+
+def test_created_ticket_is_returned_when_its_comment_fails(servers, bot):
+    jira, _ = servers
+    fail_comments_on(bot, None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ticket = bot.create_ticket("Checkout returns 500", "Stack trace attached", "Bug", "BENCH")
+    assert ticket["ticket_id"] in jira.issues
+    assert ticket["analysis"].startswith("error: ")
+    assert ticket["ticket_id"] not in bot.ticket_store.processed_ids()
\ No newline at end of file
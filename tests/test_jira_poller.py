@@ -0,0 +1,53 @@
+"""
+The incremental watermark only advances over tickets that were handled.
+"""
+
+import json
+import pytest
+
+pytest.importorskip("requests")
+
+from jira_poller import IncrementalPoller
+
+class FakeJiraClient:
+    def __init__(self, tickets):
+        self.tickets = tickets
+        self.queries = []
+
+    def iter_tickets(self, jql, page_size=100):
+        self.queries.append(jql)
+        return iter(self.tickets)
+
+def ticket(key: str, updated: str):
+    return {"ticket_id": key, "updated_at": f"2024-05-01T10:{updated}.000+0000"}
+
+TICKETS = [ticket("BENCH-3", "00:03"), ticket("BENCH-1", "00:01"), ticket("BENCH-2", "00:01")]
+
+def test_commit_stops_before_first_failure(tmp_path):
+    path = str(tmp_path / "watermark.json")
+    poller = IncrementalPoller(FakeJiraClient(TICKETS), "project = BENCH ORDER BY key", path)
+    polled = poller.poll()
+    assert [t["ticket_id"] for t in polled] == ["BENCH-1", "BENCH-2", "BENCH-3"]
+
+    # BENCH-3 succeeded, but it comes after the failed BENCH-2, so both are fetched again
+    poller.commit(failed_ids={"BENCH-2"})
+    assert poller.watermark == {"updated": "2024-05-01T10:00:01.000+0000", "key": "BENCH-1"}
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == poller.watermark
+    assert [t["ticket_id"] for t in poller.poll()] == ["BENCH-2", "BENCH-3"]
+
+def test_commit_without_progress_keeps_watermark(tmp_path):
+    path = str(tmp_path / "watermark.json")
+    poller = IncrementalPoller(FakeJiraClient(TICKETS), "project = BENCH", path)
+    poller.poll()
+    poller.commit(failed_ids={"BENCH-1"})
+    assert poller.watermark is None
+
+    poller.poll()
+    poller.commit()
+    assert poller.watermark["key"] == "BENCH-3"
+    # A restarted poller resumes from the saved watermark
+    reloaded = IncrementalPoller(FakeJiraClient(TICKETS), "project = BENCH", path)
+    assert reloaded.poll() == []
+    assert "updated >= -" in reloaded.jira_client.queries[0]
+    assert reloaded.jira_client.queries[0].endswith("ORDER BY updated ASC, key ASC")
\ No newline at end of file
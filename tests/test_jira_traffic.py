@@ -0,0 +1,120 @@
+"""
+Retries, Retry-After handling, the unlimited/limited switch and GET coalescing in the Jira traffic layer.
+"""
+
+import threading
+import time
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from jira_traffic import AdaptiveTokenBucket, JiraTraffic
+
+URL = "https://jira.example.com/rest/api/2/issue/BENCH-1"
+
+def response(status: int, headers=None) -> "requests.Response":
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    r._content = b"{}"
+    r._content_consumed = True
+    return r
+
+def scripted(*responses):
+    """A `send` that answers with `responses` in order and records each call."""
+    calls = []
+
+    def send(request, **kwargs):
+        calls.append(request)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    return send, calls
+
+def prepared(method: str = "GET", url: str = URL):
+    return requests.Request(method, url).prepare()
+
+@pytest.fixture
+def traffic():
+    return JiraTraffic(max_retries=2, backoff_base=0.001, backoff_cap=1.0)
+
+def test_retries_until_success(traffic):
+    send, calls = scripted(response(503), response(502), response(200))
+    assert traffic.send(send, prepared()).status_code == 200
+    assert len(calls) == 3
+    assert traffic.stats()["retried"] == 2 and traffic.stats()["failed"] == 0
+
+def test_gives_up_after_max_retries(traffic):
+    send, calls = scripted(response(503))
+    assert traffic.send(send, prepared()).status_code == 503
+    assert len(calls) == 3
+    assert traffic.stats()["failed"] == 1
+
+def test_post_is_retried_only_after_429(traffic):
+    send, calls = scripted(response(503))
+    assert traffic.send(send, prepared("POST")).status_code == 503
+    assert len(calls) == 1
+    send, calls = scripted(response(429), response(201))
+    assert traffic.send(send, prepared("POST")).status_code == 201
+    assert len(calls) == 2
+
+def test_short_retry_after_is_waited_out(traffic):
+    send, calls = scripted(response(429, {"Retry-After": "0.2"}), response(200))
+    started = time.monotonic()
+    assert traffic.send(send, prepared()).status_code == 200
+    assert time.monotonic() - started >= 0.2
+    assert traffic.stats()["throttled"] == 1
+
+def test_long_retry_after_is_returned_instead_of_slept(traffic):
+    send, calls = scripted(response(429, {"Retry-After": "3600"}))
+    started = time.monotonic()
+    assert traffic.send(send, prepared()).status_code == 429
+    assert time.monotonic() - started < 1.0
+    assert len(calls) == 1
+    # Other requests are paused for at most the backoff cap
+    assert traffic.bucket.paused_until - time.monotonic() <= traffic.backoff_cap
+
+def test_bucket_limits_only_after_pushback_and_lifts_again():
+    bucket = AdaptiveTokenBucket(recovery=1.0)
+    for _ in range(20):
+        bucket.acquire()
+    assert bucket.rate is None
+    bucket.on_throttled(None)
+    # Halved from the 20 requests seen in the last second
+    assert bucket.rate == 10.0
+    for _ in range(9):
+        bucket.on_success()
+    assert bucket.rate == 19.0
+    bucket.on_success()
+    assert bucket.rate is None
+
+def test_fixed_ceiling_is_never_lifted():
+    bucket = AdaptiveTokenBucket(rate=5, recovery=1.0)
+    bucket.on_throttled(None)
+    assert bucket.rate == 2.5
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rate == 5
+
+def test_identical_concurrent_gets_share_one_request(traffic):
+    release = threading.Event()
+    calls = []
+
+    def send(request, **kwargs):
+        calls.append(request)
+        release.wait(5)
+        return response(200)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(traffic.send(send, prepared()))) for _ in range(2)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.001)
+    threads[1].start()
+    while traffic.stats()["coalesced"] < 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert [r.status_code for r in results] == [200, 200]
+    assert results[0] is not results[1]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Two workers sharing one SQLite lease store must never both own a ticket.
+"""
+
+import pytest
+
+from ticket_lease import LeaseStore, SQLiteLeaseStore, TicketCoordinator
+
+@pytest.fixture
+def coordinators(tmp_path):
+    path = str(tmp_path / "leases.db")
+    first = TicketCoordinator(SQLiteLeaseStore(path), worker_id="worker-a", heartbeat_interval=3600)
+    second = TicketCoordinator(SQLiteLeaseStore(path), worker_id="worker-b", heartbeat_interval=3600)
+    yield first, second
+    first.close()
+    second.close()
+
+def test_only_one_worker_claims_a_ticket(coordinators):
+    first, second = coordinators
+    assert first.claim("BENCH-1") == "claimed"
+    assert second.claim("BENCH-1") == "held"
+    # Claiming again is idempotent for the holder
+    assert first.claim("BENCH-1") == "claimed"
+
+def test_failed_ticket_can_be_claimed_by_another_worker(coordinators):
+    first, second = coordinators
+    assert first.claim("BENCH-1") == "claimed"
+    first.release("BENCH-1", done=False)
+    # The released lease has expired, so the other worker takes it over
+    assert second.claim("BENCH-1") == "claimed"
+    assert first.claim("BENCH-1") == "held"
+
+def test_done_ticket_is_not_claimed_again(coordinators):
+    first, second = coordinators
+    assert first.claim("BENCH-1") == "claimed"
+    first.release("BENCH-1", done=True)
+    assert second.claim("BENCH-1") == "done"
+    assert first.claim("BENCH-1") == "done"
+    assert first.store.done_ids(["BENCH-1", "BENCH-2"]) == {"BENCH-1"}
+def test_incomplete_backend_fails_at_construction():
+    class PartialStore(LeaseStore):
+        def claim(self, ticket_id, worker_id, expires_at, now):
+            return "claimed"
+
+    with pytest.raises(TypeError):
+        PartialStore()
\ No newline at end of file
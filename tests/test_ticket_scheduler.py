@@ -0,0 +1,38 @@
+"""
+Scheduling order, aging across polls, and what happens to tickets left in the queue.
+"""
+
+from ticket_scheduler import TicketScheduler
+
+def ticket(key: str, priority: str = "Medium", **fields):
+    return {"ticket_id": key, "priority": priority, "issue_type": "Task",
+            "created_at": "2024-05-01T10:00:00.000+0000", **fields}
+
+def test_higher_priority_goes_first():
+    scheduler = TicketScheduler()
+    order = [t["ticket_id"] for t in scheduler.drain([ticket("A-1", "Low"), ticket("A-2", "Blocker")])]
+    assert order == ["A-2", "A-1"]
+
+def test_unconsumed_tickets_are_dropped_when_drain_stops():
+    scheduler = TicketScheduler()
+    queue = scheduler.drain([ticket("A-1", "Blocker"), ticket("A-2", summary="old"), ticket("A-3")])
+    assert next(queue)["ticket_id"] == "A-1"
+    # The consumer fails mid-drain
+    queue.close()
+    assert scheduler.heap == [] and not scheduler.queued
+
+    # The next poll's fresh copy is used, and a ticket that left the filter is not processed
+    refreshed = list(scheduler.drain([ticket("A-2", summary="new")]))
+    assert refreshed == [ticket("A-2", summary="new")]
+
+def test_first_seen_time_survives_a_dropped_queue(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("ticket_scheduler.time.time", lambda: now[0])
+    scheduler = TicketScheduler(deadlines={"trivial": 600})
+    scheduler.push([ticket("A-1", "Trivial")])
+    scheduler.clear()
+    now[0] += 3 * 3600
+    # Three hours of waiting beat the Blocker's one-hour head start and pass the deadline
+    order = list(scheduler.drain([ticket("A-2", "Blocker"), ticket("A-1", "Trivial")]))
+    assert [t["ticket_id"] for t in order] == ["A-1", "A-2"]
+    assert order[0].get("fast_triage")
\ No newline at end of file
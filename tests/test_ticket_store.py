@@ -0,0 +1,87 @@
+"""
+Crash recovery and compaction of the memory-mapped ticket store.
+"""
+
+import json
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ticket_store import TicketStore
+
+DIM = 4
+
+def vector(i: int):
+    v = np.zeros(DIM, dtype=np.float32)
+    v[i % DIM] = 1.0
+    return v
+
+def ticket(i: int):
+    return {"ticket_id": f"T-{i}", "summary": f"summary {i}"}
+
+def header_path(store: TicketStore) -> str:
+    return os.path.join(store.path, store.generation, "header.json")
+
+def test_reopen_ignores_uncommitted_append(tmp_path):
+    store = TicketStore(str(tmp_path), DIM)
+    store.add_many([(f"T-{i}", vector(i), ticket(i)) for i in range(2)])
+    with open(header_path(store), encoding="utf-8") as f:
+        committed_header = f.read()
+    # Crash after the rows and metadata are written but before the header commits them
+    store.add("T-2", vector(2), ticket(2))
+    store.close()
+    with open(header_path(store), "w", encoding="utf-8") as f:
+        f.write(committed_header)
+    meta_path = os.path.join(str(tmp_path), store.generation, "tickets.jsonl")
+    with open(meta_path, "ab") as f:
+        f.write(b'{"ticket_id": "T-9", "summ')
+
+    store = TicketStore(str(tmp_path), DIM)
+    try:
+        assert set(store.rows) == {"T-0", "T-1"}
+        assert os.path.getsize(meta_path) == json.loads(committed_header)["meta_size"]
+        # The next append reuses the uncommitted row and its metadata lands where the offsets say
+        row = store.add("T-3", vector(3), ticket(3))
+        assert row == 2
+        assert store.ticket(row) == ticket(3)
+        assert [item_id for item_id, _ in store.search(vector(3), k=1)] == ["T-3"]
+    finally:
+        store.close()
+
+    store = TicketStore(str(tmp_path), DIM)
+    try:
+        assert set(store.rows) == {"T-0", "T-1", "T-3"}
+        assert [store.ticket(row)["ticket_id"] for row in sorted(store.rows.values())] == ["T-0", "T-1", "T-3"]
+    finally:
+        store.close()
+
+def test_compaction_keeps_live_rows(tmp_path):
+    store = TicketStore(str(tmp_path), DIM, initial_capacity=4)
+    store.add_many([(f"T-{i}", vector(i), ticket(i)) for i in range(6)])
+    store.remove("T-1")
+    store.add("T-2", vector(3), {"ticket_id": "T-2", "summary": "updated"})
+    for ticket_id in ("T-0", "T-0", "T-4"):
+        store.mark_processed(ticket_id)
+    old_generation = store.generation
+
+    store.maybe_compact(max_dead_ratio=0.25, min_rows=4)
+    try:
+        assert store.generation != old_generation
+        assert not os.path.exists(os.path.join(str(tmp_path), old_generation))
+        assert store.count == 5
+        assert store.dead_ratio() == 0.0
+    finally:
+        store.close()
+
+    store = TicketStore(str(tmp_path), DIM)
+    try:
+        assert set(store.rows) == {"T-0", "T-2", "T-3", "T-4", "T-5"}
+        assert store.ticket(store.rows["T-2"])["summary"] == "updated"
+        assert store.ticket(store.rows["T-5"]) == ticket(5)
+        assert np.array_equal(store.vectors[store.rows["T-2"]], vector(3))
+        assert store.search(vector(1), k=1)[0][0] == "T-5"
+        with open(os.path.join(str(tmp_path), "processed.txt"), encoding="utf-8") as f:
+            assert f.read().split() == ["T-0", "T-4"]
+    finally:
+        store.close()
\ No newline at end of file
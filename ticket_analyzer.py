@@ -2,7 +2,9 @@
 Analyzes Jira tickets using an LLM and formats responses using templates.
 """
 
-from langchain_ollama import OllamaLLM
+from llm_cache import CachedLLM, LLMCache
+from model_runtime import ModelRuntime
+from triage_classifier import TriageClassifier
 from agent_template import (
     GREETING,
     get_root_cause_prompt,
@@ -15,8 +17,13 @@ from agent_template import (
 )
 
 class TicketAnalyzer:
-    def __init__(self):
-        self.llm = OllamaLLM(model="gemma3:1b", temperature=0.7)
+    def __init__(self, llm_cache: LLMCache = None, deterministic: bool = False, llm=None,
+                 triage_classifier: TriageClassifier = None, triage_threshold: float = 0.6):
+        self.llm = llm or ModelRuntime()
+        if llm_cache:
+            self.llm = CachedLLM(self.llm, llm_cache, deterministic)
+        self.triage_classifier = triage_classifier
+        self.triage_threshold = triage_threshold
 
     def analyze_ticket(self, ticket: dict, logs: str, similar_tickets: list, jira_base_url: str) -> str:
         """Analyze a ticket and return a formatted response with greeting and similar tickets."""
@@ -27,9 +34,10 @@ class TicketAnalyzer:
         if not description and not logs:
             analysis = UNCLEAR_ISSUE_RESPONSE
         else:
-            # Use triage for short descriptions (<50 chars) or non-Bug/Support tickets, root cause otherwise
-            if len(description) < 50 or ticket_type not in ["Bug", "Support"]:
-                analysis = self._perform_initial_triage(ticket_id, description)
+            # Use triage for short descriptions (<50 chars), non-Bug/Support tickets or tickets past their
+            # scheduling deadline, root cause otherwise
+            if len(description) < 50 or ticket_type not in ["Bug", "Support"] or ticket.get("fast_triage"):
+                analysis = self._perform_local_triage(ticket) or self._perform_initial_triage(ticket_id, description)
             else:
                 analysis = self._perform_root_cause_analysis(ticket_id, description, logs)
 
@@ -54,6 +62,16 @@ class TicketAnalyzer:
             print(f"Error analyzing ticket {ticket_id}: {e}")
             return UNCLEAR_ISSUE_RESPONSE
 
+    def _perform_local_triage(self, ticket: dict):
+        """Route the ticket with the local classifier; returns None when it is not confident enough."""
+        if not self.triage_classifier:
+            return None
+        team, confidence = self.triage_classifier.predict(TriageClassifier.ticket_text(ticket))
+        if team is None or confidence < self.triage_threshold:
+            return None
+        summary = ticket.get("summary") or ticket["description"].strip().split("\n", 1)[0][:200]
+        return format_initial_triage_response(ticket["ticket_id"], summary, f"{team} (confidence {confidence:.2f})")
+
     def _perform_initial_triage(self, ticket_id: str, description: str) -> str:
         """Perform initial triage and format the response."""
         prompt = get_initial_triage_prompt(description)
@@ -0,0 +1,253 @@
+"""
+Coordinates several bot workers sharing one JQL filter.
+
+Each ticket is claimed through a lease with an expiry in a shared store, so only one
+worker analyzes and comments on it. Polled tickets are sharded across live workers by
+rendezvous hashing of their keys. A worker that stops heartbeating drops out of the
+shard map, and its expired leases are reclaimed by the others.
+"""
+
+import hashlib
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+class LeaseStore(ABC):
+    """Interface for shared lease storage; implement this to add a backend (e.g. Redis or Postgres)."""
+
+    @abstractmethod
+    def claim(self, ticket_id: str, worker_id: str, expires_at: float, now: float) -> str:
+        """
+        Try to take the lease on a ticket. Returns "claimed", "reclaimed" (an expired lease
+        was taken over), "held" (another worker holds a live lease) or "done".
+        """
+
+    @abstractmethod
+    def renew(self, ticket_ids: Iterable[str], worker_id: str, expires_at: float):
+        ...
+
+    @abstractmethod
+    def release(self, ticket_id: str, worker_id: str, done: bool):
+        """Give up a lease; `done` records the ticket as finished for every worker."""
+
+    @abstractmethod
+    def done_ids(self, ticket_ids: Iterable[str]) -> Set[str]:
+        ...
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, now: float):
+        ...
+
+    @abstractmethod
+    def live_workers(self, since: float) -> List[str]:
+        ...
+
+    def close(self):
+        pass
+
+class SQLiteLeaseStore(LeaseStore):
+    """
+    Lease store in a SQLite file on a volume shared by the workers. SQLite's file locking
+    serialises claims, so the volume must support POSIX locks (local disk or a shared
+    Docker volume; not most NFS mounts).
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    ticket_id TEXT PRIMARY KEY,
+                    worker_id TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    done INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    heartbeat_at REAL NOT NULL
+                );
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shared between threads, so keep one per thread
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+        return connection
+
+    def claim(self, ticket_id: str, worker_id: str, expires_at: float, now: float) -> str:
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front, making read-then-write atomic across processes
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT worker_id, expires_at, done FROM leases WHERE ticket_id = ?", (ticket_id,)
+            ).fetchone()
+            if row is None:
+                result = "claimed"
+            elif row[2]:
+                result = "done"
+            elif row[0] == worker_id:
+                result = "claimed"
+            elif row[1] < now:
+                result = "reclaimed"
+            else:
+                result = "held"
+            if result in ("claimed", "reclaimed"):
+                connection.execute(
+                    "INSERT INTO leases (ticket_id, worker_id, expires_at, done) VALUES (?, ?, ?, 0) "
+                    "ON CONFLICT(ticket_id) DO UPDATE SET worker_id = excluded.worker_id, "
+                    "expires_at = excluded.expires_at",
+                    (ticket_id, worker_id, expires_at)
+                )
+            connection.execute("COMMIT")
+            return result
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def renew(self, ticket_ids: Iterable[str], worker_id: str, expires_at: float):
+        self._connection().executemany(
+            "UPDATE leases SET expires_at = ? WHERE ticket_id = ? AND worker_id = ? AND done = 0",
+            [(expires_at, ticket_id, worker_id) for ticket_id in ticket_ids]
+        )
+
+    def release(self, ticket_id: str, worker_id: str, done: bool):
+        if done:
+            self._connection().execute(
+                "INSERT INTO leases (ticket_id, worker_id, expires_at, done) VALUES (?, ?, 0, 1) "
+                "ON CONFLICT(ticket_id) DO UPDATE SET done = 1, expires_at = 0",
+                (ticket_id, worker_id)
+            )
+        else:
+            self._connection().execute(
+                "UPDATE leases SET expires_at = 0 WHERE ticket_id = ? AND worker_id = ? AND done = 0",
+                (ticket_id, worker_id)
+            )
+
+    def done_ids(self, ticket_ids: Iterable[str]) -> Set[str]:
+        ticket_ids = list(ticket_ids)
+        done = set()
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ticket_ids), 500):
+            chunk = ticket_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection().execute(
+                f"SELECT ticket_id FROM leases WHERE done = 1 AND ticket_id IN ({placeholders})", chunk
+            )
+            done.update(row[0] for row in rows)
+        return done
+
+    def heartbeat(self, worker_id: str, now: float):
+        self._connection().execute(
+            "INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) "
+            "ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+            (worker_id, now)
+        )
+
+    def live_workers(self, since: float) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT worker_id FROM workers WHERE heartbeat_at >= ? ORDER BY worker_id", (since,)
+        )
+        return [row[0] for row in rows]
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+def open_lease_store(location: str) -> LeaseStore:
+    """Open a lease store from a location such as `sqlite:////data/leases.db` or a plain file path."""
+    if location.startswith("sqlite:///"):
+        return SQLiteLeaseStore(location[len("sqlite:///"):])
+    if "://" in location:
+        raise ValueError(f"Unsupported lease store: {location}")
+    return SQLiteLeaseStore(location)
+
+class TicketCoordinator:
+    def __init__(self, store: LeaseStore, worker_id: Optional[str] = None, lease_seconds: float = 600,
+                 heartbeat_interval: float = 15, metrics=None):
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        # A worker missing three heartbeats is treated as gone and its shard is redistributed
+        self.worker_timeout = heartbeat_interval * 3
+        self.metrics = metrics
+        self.held: Set[str] = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.store.heartbeat(self.worker_id, time.time())
+        self.thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+        self.thread.start()
+
+    def _heartbeat_loop(self):
+        """Announce this worker and extend the leases it holds while their tickets are worked on."""
+        while not self.stopped.wait(self.heartbeat_interval):
+            try:
+                now = time.time()
+                self.store.heartbeat(self.worker_id, now)
+                with self.lock:
+                    held = list(self.held)
+                if held:
+                    self.store.renew(held, self.worker_id, now + self.lease_seconds)
+            except Exception as e:
+                print(f"Error renewing leases for worker {self.worker_id}: {e}")
+
+    @staticmethod
+    def _weight(worker_id: str, ticket_id: str) -> int:
+        digest = hashlib.blake2b(f"{worker_id}/{ticket_id}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def partition(self, tickets: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        Split polled tickets into this worker's shard and the IDs of other shards' tickets
+        that are not finished yet.
+        """
+        workers = self.store.live_workers(time.time() - self.worker_timeout)
+        if self.worker_id not in workers:
+            workers.append(self.worker_id)
+        mine, others = [], []
+        for ticket in tickets:
+            # Rendezvous hashing: adding or losing a worker only moves that worker's share of keys
+            owner = max(workers, key=lambda worker_id: self._weight(worker_id, ticket["ticket_id"]))
+            (mine if owner == self.worker_id else others).append(ticket["ticket_id"])
+        done = self.store.done_ids(others) if others else set()
+        mine_ids = set(mine)
+        return [t for t in tickets if t["ticket_id"] in mine_ids], [i for i in others if i not in done]
+
+    def claim(self, ticket_id: str) -> str:
+        """Take the lease on a ticket: "claimed", "held" by another worker, or already "done"."""
+        now = time.time()
+        result = self.store.claim(ticket_id, self.worker_id, now + self.lease_seconds, now)
+        if self.metrics:
+            self.metrics.inc("lease_claims_total", result=result)
+        if result == "reclaimed":
+            print(f"Worker {self.worker_id} reclaimed expired lease on ticket {ticket_id}")
+            result = "claimed"
+        if result == "claimed":
+            with self.lock:
+                self.held.add(ticket_id)
+        return result
+
+    def release(self, ticket_id: str, done: bool = False):
+        """Release a claimed ticket, marking it done for all workers or leaving it for a retry."""
+        with self.lock:
+            self.held.discard(ticket_id)
+        self.store.release(ticket_id, self.worker_id, done)
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self.store.close()
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Concurrent, staged ticket-processing pipeline for the Jira AI Bot.
+
+Jira round-trips and LLM inference run on separate, bounded thread pools so that
+one ticket's HTTP calls overlap with another ticket's inference.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable
+
+class TicketPipeline:
+    def __init__(self, bot, max_in_flight: int = 8, jira_concurrency: int = 4, llm_concurrency: int = 1):
+        self.bot = bot
+        self.max_in_flight = max_in_flight
+        self.jira_pool = ThreadPoolExecutor(max_workers=jira_concurrency, thread_name_prefix="jira-io")
+        self.llm_pool = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+        self.ticket_pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="ticket")
+
+    def process(self, tickets: Iterable[Dict]) -> Dict[str, str]:
+        """
+        Process tickets concurrently and return a status per ticket ID
+        ("commented", "skipped", "claimed elsewhere" or "error: ...").
+        """
+        # Backpressure: stop pulling tickets while max_in_flight are being worked on
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        futures = {}
+        tickets = iter(tickets)
+        while True:
+            in_flight.acquire()
+            # Take the next ticket only once a slot is free, so a scheduler decides as late as possible
+            ticket = next(tickets, None)
+            if ticket is None:
+                in_flight.release()
+                break
+            future = self.ticket_pool.submit(self._process_ticket, ticket)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures[future] = ticket["ticket_id"]
+
+        results = {}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+        return results
+
+    def submit(self, ticket: Dict) -> Future:
+        """Queue one ticket without waiting; the future resolves to its status."""
+        return self.ticket_pool.submit(self._process_ticket, ticket)
+
+    def _process_ticket(self, ticket: Dict) -> str:
+        """Run one ticket through dedupe, similarity, attachments, analysis and commenting."""
+        bot = self.bot
+        ticket_id = ticket["ticket_id"]
+        if ticket_id in bot.processed_tickets:
+            return "skipped"
+        claim = bot._claim(ticket_id)
+        if claim != "claimed":
+            return "claimed elsewhere" if claim == "held" else "skipped"
+        trace = bot.metrics.ticket_trace(ticket)
+        try:
+            if self.jira_pool.submit(trace.timed("dedupe", bot.jira_client.has_bot_comment), ticket_id, ticket).result():
+                bot._release(ticket_id, done=True)
+                trace.finish("skipped", log=False)
+                return "skipped"
+            print(f"Processing new ticket {ticket_id}: {ticket['summary']}")
+            # Start the attachment download while similarity runs
+            logs_future = self.jira_pool.submit(trace.timed("attachments", bot.fetch_logs), ticket_id, ticket)
+            similar_tickets = self.llm_pool.submit(trace.timed("similarity", self._find_similar), ticket).result()
+            logs = logs_future.result()
+            comment = self.llm_pool.submit(
+                trace.timed("analysis", bot.ticket_analyzer.analyze_ticket), ticket, logs, similar_tickets, bot.jira_base_url
+            ).result()
+            if not self.jira_pool.submit(trace.timed("comment", bot.jira_client.add_comment), ticket_id, comment).result():
+                raise RuntimeError(f"Comment on ticket {ticket_id} was not posted")
+            bot._mark_processed(ticket_id)
+            trace.finish("commented", comment_chars=len(comment))
+            return "commented"
+        except Exception as e:
+            print(f"Error processing ticket {ticket_id}: {e}")
+            bot._release(ticket_id)
+            trace.finish("error", error=str(e))
+            return f"error: {e}"
+
+    def _find_similar(self, ticket: Dict):
+        self.bot.similarity_checker.add_ticket(ticket)
+        return self.bot.similarity_checker.find_similar_tickets(ticket, self.bot.jira_base_url)
+
+    def shutdown(self):
+        """Wait for running work and release the thread pools."""
+        self.ticket_pool.shutdown(wait=True)
+        self.jira_pool.shutdown(wait=True)
+        self.llm_pool.shutdown(wait=True)
\ No newline at end of file
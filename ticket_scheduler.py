@@ -0,0 +1,142 @@
+"""
+Orders fetched tickets so urgent ones are analyzed first when a backlog builds up.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from jira_poller import parse_jira_timestamp
+
+# Head start in seconds of queue time, covering Jira's default priority schemes old and new
+PRIORITY_HEAD_START = {
+    "blocker": 3600, "highest": 3600,
+    "critical": 1200, "high": 1200,
+    "major": 300, "medium": 300,
+}
+ISSUE_TYPE_HEAD_START = {"bug": 120, "support": 120}
+WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 14400)
+
+def ticket_class(ticket: Dict) -> str:
+    """The scheduling class of a ticket: its Jira priority, lower-cased."""
+    return (ticket.get("priority") or "none").lower()
+
+def parse_class_seconds(value: Optional[str]) -> Dict[str, float]:
+    """Parse `Blocker=300,Critical=900` into `{"blocker": 300.0, "critical": 900.0}`."""
+    result = {}
+    for item in (value or "").split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            result[name.strip().lower()] = float(seconds)
+    return result
+
+class TicketScheduler:
+    """
+    Priority queue between fetching and processing. A ticket's key is the time the bot first
+    saw it minus a head start for its priority and issue type, with older tickets first on
+    ties. First-seen times survive across polls, so a ticket left unfinished by a failure or
+    another worker's lease keeps aging. A low-priority ticket waits at most the largest head
+    start longer than it would in FIFO order.
+
+    A class with a deadline switches its tickets to fast triage (no attachments, no root-cause
+    prompt) once they have waited longer than the deadline since they were first seen.
+    """
+
+    def __init__(self, priority_head_start: Optional[Dict[str, float]] = None,
+                 issue_type_head_start: Optional[Dict[str, float]] = None,
+                 deadlines: Optional[Dict[str, float]] = None, metrics=None, forget_after: float = 24 * 3600):
+        self.priority_head_start = PRIORITY_HEAD_START if priority_head_start is None else priority_head_start
+        self.issue_type_head_start = ISSUE_TYPE_HEAD_START if issue_type_head_start is None else issue_type_head_start
+        self.deadlines = deadlines or {}
+        self.metrics = metrics
+        self.heap: List[tuple] = []
+        self.queued = set()
+        # ticket_id -> (first seen, last seen); a ticket not seen for `forget_after` is dropped
+        self.seen: Dict[str, Tuple[float, float]] = {}
+        self.forget_after = forget_after
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _created(ticket: Dict) -> float:
+        try:
+            return parse_jira_timestamp(ticket["created_at"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    def push(self, tickets: Iterable[Dict]):
+        now = time.time()
+        with self.lock:
+            for ticket in tickets:
+                ticket_id = ticket["ticket_id"]
+                first_seen = self.seen.get(ticket_id, (now, now))[0]
+                self.seen[ticket_id] = (first_seen, now)
+                if ticket_id in self.queued:
+                    continue
+                self.queued.add(ticket_id)
+                head_start = (self.priority_head_start.get(ticket_class(ticket), 0)
+                              + self.issue_type_head_start.get(ticket.get("issue_type", "").lower(), 0))
+                key = (first_seen - head_start, self._created(ticket), next(self.sequence))
+                heapq.heappush(self.heap, (key, ticket))
+            self._forget_stale(now)
+            self._gauge()
+
+    def _forget_stale(self, now: float):
+        """Drop first-seen times of tickets that stopped showing up (finished or out of the filter)."""
+        stale = [ticket_id for ticket_id, (_, last_seen) in self.seen.items()
+                 if now - last_seen > self.forget_after and ticket_id not in self.queued]
+        for ticket_id in stale:
+            del self.seen[ticket_id]
+
+    def forget(self, ticket_id: str):
+        """Stop tracking a finished ticket."""
+        with self.lock:
+            if ticket_id not in self.queued:
+                self.seen.pop(ticket_id, None)
+
+    def pop(self) -> Optional[Dict]:
+        """Take the most urgent ticket, flagging it for fast triage if it is past its deadline."""
+        with self.lock:
+            if not self.heap:
+                return None
+            _, ticket = heapq.heappop(self.heap)
+            self.queued.discard(ticket["ticket_id"])
+            waited = time.time() - self.seen[ticket["ticket_id"]][0]
+            self._gauge()
+        cls = ticket_class(ticket)
+        deadline = self.deadlines.get(cls)
+        if deadline is not None and waited > deadline:
+            ticket["fast_triage"] = True
+        if self.metrics:
+            self.metrics.observe("queue_wait_seconds", waited, WAIT_BUCKETS, **{"class": cls})
+            if ticket.get("fast_triage"):
+                self.metrics.inc("scheduler_fast_triage_total", **{"class": cls})
+        return ticket
+
+    def drain(self, tickets: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Queue `tickets` and yield everything queued in priority order, popping lazily. Tickets
+        not taken when the consumer stops are dropped, since their snapshot goes stale; the next
+        poll brings fresh copies, which keep their first-seen time.
+        """
+        self.push(tickets)
+        try:
+            while True:
+                ticket = self.pop()
+                if ticket is None:
+                    return
+                yield ticket
+        finally:
+            self.clear()
+
+    def clear(self):
+        """Drop every queued ticket, keeping first-seen times."""
+        with self.lock:
+            self.heap = []
+            self.queued.clear()
+            self._gauge()
+
+    def _gauge(self):
+        if self.metrics:
+            self.metrics.set_gauge("scheduler_queue_depth", len(self.heap))
\ No newline at end of file
@@ -0,0 +1,377 @@
+"""
+Persistent, memory-mapped store for ticket similarity vectors and processed-ticket state.
+
+Layout of the store directory:
+- CURRENT: name of the live generation directory.
+- gen-NNNNNN/header.json: dim, capacity, committed row count and metadata size.
+- gen-NNNNNN/vectors.f32, ids.bin, offsets.u64, alive.u8: fixed-width, memory-mapped row arrays.
+- gen-NNNNNN/tickets.jsonl: append-only ticket metadata, one JSON line per row.
+- processed.txt: append-only log of ticket IDs the bot has commented on.
+- LOCK: flock'd by the one process that has the store open; a second writer is refused.
+
+A row only becomes visible once header.json is atomically replaced with the new count,
+so a crash mid-append leaves the previous state intact. Compaction writes a fresh
+generation and switches CURRENT atomically.
+"""
+
+import fcntl
+import functools
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from vector_index import top_k_rows
+
+ID_WIDTH = 64
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _atomic_write(path: str, data: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path))
+
+def _resize(path: str, size: int):
+    with open(path, "ab") as f:
+        f.truncate(size)
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class _TicketRecords:
+    """Read-only sequence view that loads ticket metadata lazily, row by row."""
+
+    def __init__(self, store: "TicketStore"):
+        self.store = store
+
+    def __len__(self) -> int:
+        return self.store.count
+
+    def __getitem__(self, row: int) -> Dict:
+        return self.store.ticket(row)
+
+class TicketStore:
+    """Append-only ticket metadata plus a memory-mapped vector matrix, opened in constant time."""
+
+    def __init__(self, path: str, dim: int, initial_capacity: int = 1024):
+        self.path = path
+        self.initial_capacity = initial_capacity
+        self.tickets = _TicketRecords(self)
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        # Two writers would overwrite each other's rows, so fail fast instead of losing data
+        self._lock_file = open(os.path.join(path, "LOCK"), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            raise RuntimeError(f"Ticket store at {path} is already open in another process or bot instance")
+
+        current = os.path.join(path, "CURRENT")
+        if os.path.exists(current):
+            with open(current, encoding="utf-8") as f:
+                self.generation = f.read().strip()
+        else:
+            self.generation = self._create_generation(1, dim, initial_capacity)
+            _atomic_write(current, self.generation)
+        self._remove_stale_generations()
+        self._open_generation()
+        if self.dim != dim:
+            self.close()
+            raise ValueError(
+                f"Ticket store at {path} holds {self.dim}-dimensional vectors, "
+                f"but the embedder produces {dim}. Use a new store path or the original embedder."
+            )
+
+        self._processed_path = os.path.join(path, "processed.txt")
+        self._processed_file = open(self._processed_path, "a", encoding="utf-8")
+
+    # Generation management
+
+    def _generation_dir(self, generation: str) -> str:
+        return os.path.join(self.path, generation)
+
+    def _create_generation(self, number: int, dim: int, capacity: int) -> str:
+        generation = f"gen-{number:06d}"
+        directory = self._generation_dir(generation)
+        os.makedirs(directory, exist_ok=True)
+        _resize(os.path.join(directory, "vectors.f32"), capacity * dim * 4)
+        _resize(os.path.join(directory, "ids.bin"), capacity * ID_WIDTH)
+        _resize(os.path.join(directory, "offsets.u64"), capacity * 8)
+        _resize(os.path.join(directory, "alive.u8"), capacity)
+        open(os.path.join(directory, "tickets.jsonl"), "ab").close()
+        header = {"dim": dim, "capacity": capacity, "count": 0, "meta_size": 0}
+        _atomic_write(os.path.join(directory, "header.json"), json.dumps(header))
+        return generation
+
+    def _remove_stale_generations(self):
+        """Drop generations left behind by an interrupted compaction."""
+        for name in os.listdir(self.path):
+            if name.startswith("gen-") and name != self.generation:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _open_generation(self):
+        directory = self._generation_dir(self.generation)
+        with open(os.path.join(directory, "header.json"), encoding="utf-8") as f:
+            header = json.load(f)
+        self.dim = header["dim"]
+        self.capacity = header["capacity"]
+        self.count = header["count"]
+        self.meta_size = header["meta_size"]
+        self._rows: Optional[Dict[str, int]] = None
+        self._map_arrays()
+        # Anything past the committed size is a partially written record from a crash
+        self._meta = open(os.path.join(directory, "tickets.jsonl"), "r+b")
+        self._meta.truncate(self.meta_size)
+
+    def _map_arrays(self):
+        directory = self._generation_dir(self.generation)
+        self._vectors = np.memmap(os.path.join(directory, "vectors.f32"), dtype=np.float32, mode="r+",
+                                  shape=(self.capacity, self.dim))
+        self._ids = np.memmap(os.path.join(directory, "ids.bin"), dtype=f"S{ID_WIDTH}", mode="r+",
+                              shape=(self.capacity,))
+        self._offsets = np.memmap(os.path.join(directory, "offsets.u64"), dtype=np.uint64, mode="r+",
+                                  shape=(self.capacity,))
+        self._alive = np.memmap(os.path.join(directory, "alive.u8"), dtype=np.uint8, mode="r+",
+                                shape=(self.capacity,))
+
+    def _flush_arrays(self):
+        for array in (self._vectors, self._ids, self._offsets, self._alive):
+            array.flush()
+
+    def _unmap_arrays(self):
+        self._flush_arrays()
+        del self._vectors, self._ids, self._offsets, self._alive
+
+    def _write_header(self):
+        header = {"dim": self.dim, "capacity": self.capacity, "count": self.count, "meta_size": self.meta_size}
+        _atomic_write(os.path.join(self._generation_dir(self.generation), "header.json"), json.dumps(header))
+
+    def _grow(self):
+        directory = self._generation_dir(self.generation)
+        capacity = self.capacity * 2
+        self._unmap_arrays()
+        _resize(os.path.join(directory, "vectors.f32"), capacity * self.dim * 4)
+        _resize(os.path.join(directory, "ids.bin"), capacity * ID_WIDTH)
+        _resize(os.path.join(directory, "offsets.u64"), capacity * 8)
+        _resize(os.path.join(directory, "alive.u8"), capacity)
+        self.capacity = capacity
+        self._map_arrays()
+        self._write_header()
+
+    # Index interface shared with VectorIndex
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        """Mapping of live ticket ID to row, built on first use."""
+        if self._rows is None:
+            rows = {}
+            alive = self._alive[:self.count]
+            for row, raw_id in enumerate(self._ids[:self.count]):
+                if not alive[row]:
+                    continue
+                ticket_id = raw_id.decode("utf-8")
+                previous = rows.get(ticket_id)
+                if previous is not None:
+                    # Replacement interrupted before the old row was retired
+                    self._alive[previous] = 0
+                rows[ticket_id] = row
+            self._rows = rows
+        return self._rows
+
+    @_locked
+    def add(self, item_id: str, vector: np.ndarray, ticket: Dict) -> int:
+        """Append a ticket and its vector, retiring any previous row for the same ID."""
+        return self.add_many([(item_id, vector, ticket)])[0]
+
+    @_locked
+    def add_many(self, items: Iterable[Tuple[str, np.ndarray, Dict]]) -> List[int]:
+        """Append a batch of tickets with a single flush and fsync; returns their rows."""
+        rows = self.rows
+        added = []
+        lines = []
+        meta_size = self.meta_size
+        for item_id, vector, ticket in items:
+            encoded_id = item_id.encode("utf-8")
+            if len(encoded_id) > ID_WIDTH:
+                raise ValueError(f"Ticket ID {item_id} is longer than {ID_WIDTH} bytes")
+            row = self.count + len(added)
+            if row == self.capacity:
+                self._grow()
+            line = (json.dumps(ticket) + "\n").encode("utf-8")
+            self._vectors[row] = vector
+            self._ids[row] = encoded_id
+            self._offsets[row] = meta_size
+            self._alive[row] = 1
+            meta_size += len(line)
+            lines.append(line)
+            added.append((item_id, row))
+        if not added:
+            return []
+
+        self._meta.seek(self.meta_size)
+        self._meta.write(b"".join(lines))
+        self._meta.flush()
+        os.fsync(self._meta.fileno())
+        self._flush_arrays()
+
+        # Rows past the header's count are ignored on reopen, so the header commits the batch
+        self.count += len(added)
+        self.meta_size = meta_size
+        self._write_header()
+
+        for item_id, row in added:
+            previous = rows.get(item_id)
+            if previous is not None:
+                self._alive[previous] = 0
+            rows[item_id] = row
+        self._alive.flush()
+        return [row for _, row in added]
+
+    @_locked
+    def remove(self, item_id: str):
+        """Tombstone a ticket; its space is reclaimed by compact()."""
+        row = self.rows.pop(item_id, None)
+        if row is not None:
+            self._alive[row] = 0
+            self._alive.flush()
+
+    @_locked
+    def ticket(self, row: int) -> Dict:
+        """Read the metadata for a row straight from disk."""
+        self._meta.seek(int(self._offsets[row]))
+        return json.loads(self._meta.readline().decode("utf-8"))
+
+    @_locked
+    def search(self, vector: np.ndarray, k: int = 5, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to `k` (id, cosine similarity) pairs over live rows, best first."""
+        if self.count == 0 or k <= 0:
+            return []
+        scores = self._vectors[:self.count] @ vector
+        scores[self._alive[:self.count] == 0] = -np.inf
+        excluded_row = self.rows.get(exclude) if exclude is not None else None
+        if excluded_row is not None:
+            scores[excluded_row] = -np.inf
+        return [(self._ids[i].decode("utf-8"), float(scores[i])) for i in top_k_rows(scores, k)]
+
+    # Processed-ticket state
+
+    def processed_ids(self) -> Set[str]:
+        """Load the set of ticket IDs the bot has already handled."""
+        with open(self._processed_path, encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    @_locked
+    def mark_processed(self, ticket_id: str):
+        """Durably record that the bot has handled a ticket."""
+        self._processed_file.write(ticket_id + "\n")
+        self._processed_file.flush()
+        os.fsync(self._processed_file.fileno())
+
+    # Maintenance
+
+    def dead_ratio(self) -> float:
+        """Fraction of stored rows that are tombstoned or superseded."""
+        return 1 - len(self.rows) / self.count if self.count else 0.0
+
+    def maybe_compact(self, max_dead_ratio: float = 0.25, min_rows: int = 1024):
+        """Compact once enough of the store is garbage to make a rewrite worthwhile."""
+        if self.count >= min_rows and self.dead_ratio() > max_dead_ratio:
+            self.compact()
+
+    @_locked
+    def compact(self):
+        """Rewrite live rows into a new generation and switch to it atomically."""
+        live_rows = sorted(self.rows.values())
+        number = int(self.generation.split("-")[1]) + 1
+        capacity = max(self.initial_capacity, len(live_rows) * 2)
+        generation = self._create_generation(number, self.dim, capacity)
+        directory = self._generation_dir(generation)
+
+        meta_size = 0
+        offsets = np.zeros(len(live_rows), dtype=np.uint64)
+        with open(os.path.join(directory, "tickets.jsonl"), "wb") as meta:
+            for new_row, row in enumerate(live_rows):
+                self._meta.seek(int(self._offsets[row]))
+                line = self._meta.readline()
+                meta.write(line)
+                offsets[new_row] = meta_size
+                meta_size += len(line)
+            meta.flush()
+            os.fsync(meta.fileno())
+
+        count = len(live_rows)
+        for name, dtype, shape, source in (
+            ("vectors.f32", np.float32, (capacity, self.dim), self._vectors),
+            ("ids.bin", f"S{ID_WIDTH}", (capacity,), self._ids),
+            ("offsets.u64", np.uint64, (capacity,), None),
+            ("alive.u8", np.uint8, (capacity,), None),
+        ):
+            target = np.memmap(os.path.join(directory, name), dtype=dtype, mode="r+", shape=shape)
+            if name == "offsets.u64":
+                target[:count] = offsets
+            elif name == "alive.u8":
+                target[:count] = 1
+            else:
+                target[:count] = source[live_rows]
+            target.flush()
+            del target
+
+        header = {"dim": self.dim, "capacity": capacity, "count": count, "meta_size": meta_size}
+        _atomic_write(os.path.join(directory, "header.json"), json.dumps(header))
+
+        # Deduplicate the processed log alongside the switch
+        processed = self.processed_ids()
+        _atomic_write(self._processed_path + ".compact", "".join(f"{t}\n" for t in sorted(processed)))
+
+        old_generation = self.generation
+        self._close_generation()
+        _atomic_write(os.path.join(self.path, "CURRENT"), generation)
+        self.generation = generation
+        self._open_generation()
+        shutil.rmtree(self._generation_dir(old_generation), ignore_errors=True)
+
+        self._processed_file.close()
+        os.replace(self._processed_path + ".compact", self._processed_path)
+        self._processed_file = open(self._processed_path, "a", encoding="utf-8")
+        print(f"Compacted ticket store to {count} rows ({generation})")
+
+    def _close_generation(self):
+        self._unmap_arrays()
+        self._meta.close()
+
+    @_locked
+    def close(self):
+        """Flush and release all files."""
+        self._close_generation()
+        if hasattr(self, "_processed_file"):
+            self._processed_file.close()
+        # Closing the file releases the flock
+        self._lock_file.close()
\ No newline at end of file
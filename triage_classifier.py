@@ -0,0 +1,112 @@
+"""
+Local nearest-centroid triage classifier that routes tickets to a team/component
+without calling the LLM. Only low-confidence tickets fall back to gemma3:1b.
+
+Retrain from historical tickets with:
+    python triage_classifier.py
+using JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, TRIAGE_TRAINING_JQL, TRIAGE_LABEL_FIELD
+and TRIAGE_MODEL_PATH from the environment.
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from vector_index import HashingEmbedder
+
+class TriageClassifier:
+    def __init__(self, dim: int = 4096, scale: float = 20.0, min_similarity: float = 0.15):
+        self.embedder = HashingEmbedder(dim)
+        # Softmax temperature applied to cosine similarities when computing confidence
+        self.scale = scale
+        # Tickets unlike every team's centroid get zero confidence
+        self.min_similarity = min_similarity
+        self.labels: List[str] = []
+        self.sums = np.zeros((0, dim), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+
+    @staticmethod
+    def ticket_text(ticket: dict) -> str:
+        return f"{ticket.get('summary', '')}\n{ticket.get('description', '')}"
+
+    def fit(self, examples: Iterable[Tuple[str, str]]):
+        """Accumulate (text, team) examples into per-team centroids; may be called repeatedly."""
+        rows = {label: i for i, label in enumerate(self.labels)}
+        sums = list(self.sums)
+        counts = list(self.counts)
+        for text, label in examples:
+            row = rows.get(label)
+            if row is None:
+                row = rows[label] = len(self.labels)
+                self.labels.append(label)
+                sums.append(np.zeros(self.embedder.dim, dtype=np.float32))
+                counts.append(0)
+            sums[row] += self.embedder.embed(text)
+            counts[row] += 1
+        if sums:
+            self.sums = np.vstack(sums).astype(np.float32)
+            self.counts = np.asarray(counts, dtype=np.int64)
+        self._update_centroids()
+
+    def _update_centroids(self):
+        norms = np.linalg.norm(self.sums, axis=1, keepdims=True)
+        self.centroids = np.divide(self.sums, norms, out=np.zeros_like(self.sums), where=norms > 0)
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Return the most likely team and a confidence in [0, 1]."""
+        if not self.labels:
+            return None, 0.0
+        similarities = self.centroids @ self.embedder.embed(text)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.min_similarity:
+            return self.labels[best], 0.0
+        if len(self.labels) == 1:
+            return self.labels[0], float(similarities[best])
+        logits = (similarities - similarities[best]) * self.scale
+        probabilities = np.exp(logits)
+        return self.labels[best], float(probabilities[best] / probabilities.sum())
+
+    def save(self, path: str):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, labels=np.asarray(self.labels, dtype=str), sums=self.sums, counts=self.counts,
+                 params=np.asarray([self.embedder.dim, self.scale, self.min_similarity]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TriageClassifier":
+        with np.load(path) as data:
+            dim, scale, min_similarity = data["params"]
+            classifier = cls(int(dim), float(scale), float(min_similarity))
+            classifier.labels = [str(label) for label in data["labels"]]
+            classifier.sums = data["sums"].astype(np.float32)
+            classifier.counts = data["counts"]
+        classifier._update_centroids()
+        return classifier
+
+def retrain(jira_client, jql: str, label_field: str, model_path: str) -> TriageClassifier:
+    """Train a fresh classifier from historical tickets and save it to `model_path`."""
+    classifier = TriageClassifier()
+    examples = (
+        (TriageClassifier.ticket_text(ticket), ticket["label"])
+        for ticket in jira_client.iter_labelled_tickets(jql, label_field)
+    )
+    classifier.fit(examples)
+    classifier.save(model_path)
+    print(f"Trained triage classifier on {int(classifier.counts.sum())} tickets "
+          f"across {len(classifier.labels)} teams, saved to {model_path}")
+    return classifier
+
+def main():
+    from jira_client import JiraClient
+
+    JIRA_URL = os.getenv("JIRA_URL", "https://your-jira-instance.atlassian.net")
+    USERNAME = os.getenv("JIRA_USERNAME", "your_email@example.com")
+    API_TOKEN = os.getenv("JIRA_API_TOKEN", "your_api_token")
+    TRAINING_JQL = os.getenv("TRIAGE_TRAINING_JQL", "project = YOUR_PROJECT AND component is not EMPTY")
+    LABEL_FIELD = os.getenv("TRIAGE_LABEL_FIELD", "components")
+    MODEL_PATH = os.getenv("TRIAGE_MODEL_PATH", "triage_model.npz")
+
+    retrain(JiraClient(JIRA_URL, USERNAME, API_TOKEN), TRAINING_JQL, LABEL_FIELD, MODEL_PATH)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Embedding-backed vector index used for ticket similarity search.
+"""
+
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+class HashingEmbedder:
+    """Local embedder that hashes unigrams and bigrams into a fixed-size vector."""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text into an L2-normalised float32 vector."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            # crc32 is stable across processes, unlike the salted built-in hash()
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        return [self.embed(text) for text in texts]
+
+class OllamaEmbedder:
+    """Embedder backed by an Ollama embedding model."""
+
+    def __init__(self, model: str = "nomic-embed-text"):
+        from langchain_ollama import OllamaEmbeddings
+        self.model = model
+        self.embeddings = OllamaEmbeddings(model=model)
+        # Probe once so the dimension is known and a missing model fails early
+        self.dim = len(self.embeddings.embed_query("probe"))
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text into an L2-normalised float32 vector."""
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed several texts in one request."""
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return list(np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0))
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the row numbers of the `k` highest finite scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top[np.isfinite(scores[top])]
+
+def get_default_embedder(model: Optional[str] = None):
+    """Return an Ollama embedder if a model is given and reachable, else the local hashing embedder."""
+    if model:
+        try:
+            return OllamaEmbedder(model)
+        except Exception as e:
+            print(f"Ollama embedding model '{model}' unavailable, falling back to hashing embedder: {e}")
+    return HashingEmbedder()
+
+class VectorIndex:
+    """Contiguous NumPy matrix of unit vectors searched with vectorised cosine similarity."""
+
+    def __init__(self, dim: int, initial_capacity: int = 256):
+        self.dim = dim
+        self.vectors = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _grow(self):
+        grown = np.zeros((self.vectors.shape[0] * 2, self.dim), dtype=np.float32)
+        grown[:len(self.ids)] = self.vectors[:len(self.ids)]
+        self.vectors = grown
+
+    def add(self, item_id: str, vector: np.ndarray) -> int:
+        """Insert or replace the vector for `item_id` and return its row."""
+        row = self.rows.get(item_id)
+        if row is None:
+            if len(self.ids) == self.vectors.shape[0]:
+                self._grow()
+            row = len(self.ids)
+            self.ids.append(item_id)
+            self.rows[item_id] = row
+        self.vectors[row] = vector
+        return row
+
+    def search(self, vector: np.ndarray, k: int = 5, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to `k` (id, cosine similarity) pairs, best first."""
+        count = len(self.ids)
+        if count == 0 or k <= 0:
+            return []
+        scores = self.vectors[:count] @ vector
+        excluded_row = self.rows.get(exclude) if exclude is not None else None
+        if excluded_row is not None:
+            scores[excluded_row] = -np.inf
+        return [(self.ids[i], float(scores[i])) for i in top_k_rows(scores, k)]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Receives Jira issue webhooks and queues the affected ticket keys for processing.
+"""
+
+import hashlib
+import hmac
+import json
+import queue
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+HANDLED_EVENTS = ("jira:issue_created", "jira:issue_updated")
+ISSUE_KEY_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+
+class WebhookServer:
+    """
+    Validates Jira `issue_created`/`issue_updated` webhooks against a shared secret and puts
+    their issue keys on a bounded queue. Keys already waiting are not queued twice.
+    """
+
+    def __init__(self, secret: str, port: int = 8080, host: str = "0.0.0.0", queue_size: int = 1000,
+                 metrics=None):
+        if not secret:
+            raise ValueError("A webhook secret is required")
+        self.secret = secret.encode("utf-8")
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.metrics = metrics
+        # Set when an event had to be dropped, so the caller can reconcile early
+        self.overflowed = threading.Event()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="webhook-server", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"Listening for Jira webhooks on port {self.server.server_address[1]}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def authorized(self, body: bytes, signature: Optional[str], token: Optional[str]) -> bool:
+        """Accept an HMAC-SHA256 `X-Hub-Signature` of the body, or the secret itself as a token."""
+        if signature:
+            expected = "sha256=" + hmac.new(self.secret, body, hashlib.sha256).hexdigest()
+            return hmac.compare_digest(signature.encode("utf-8"), expected.encode("utf-8"))
+        if token:
+            return hmac.compare_digest(token.encode("utf-8"), self.secret)
+        return False
+
+    def enqueue(self, key: str) -> bool:
+        """Queue a ticket key; False if the queue is full."""
+        with self.lock:
+            if key in self.queued:
+                return True
+            try:
+                self.queue.put_nowait(key)
+            except queue.Full:
+                self.overflowed.set()
+                return False
+            self.queued.add(key)
+            return True
+
+    def drain(self, timeout: float, max_keys: int = 50, window: float = 0.05) -> List[str]:
+        """Wait up to `timeout` for a key, then collect whatever else arrives within `window`."""
+        try:
+            keys = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + window
+        while len(keys) < max_keys:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                keys.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        with self.lock:
+            self.queued.difference_update(keys)
+        return keys
+
+    def _count(self, result: str, event: str = ""):
+        if self.metrics:
+            self.metrics.inc("webhook_events_total", result=result, event=event)
+            self.metrics.set_gauge("webhook_queue_depth", self.queue.qsize())
+
+    def _make_handler(self):
+        webhooks = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                url = urlparse(self.path)
+                token = self.headers.get("X-Webhook-Secret") or parse_qs(url.query).get("secret", [None])[0]
+                if not webhooks.authorized(body, self.headers.get("X-Hub-Signature"), token):
+                    webhooks._count("unauthorized")
+                    self._reply(401)
+                    return
+                try:
+                    payload = json.loads(body)
+                    event = payload.get("webhookEvent", "")
+                    key = payload["issue"]["key"]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    webhooks._count("malformed")
+                    self._reply(400)
+                    return
+                if event not in HANDLED_EVENTS:
+                    webhooks._count("ignored", event)
+                    self._reply(204)
+                    return
+                if not isinstance(key, str) or not ISSUE_KEY_PATTERN.match(key):
+                    webhooks._count("malformed", event)
+                    self._reply(400)
+                    return
+                if webhooks.enqueue(key):
+                    webhooks._count("queued", event)
+                    self._reply(202)
+                else:
+                    # Jira retries failed deliveries; the reconciliation poll covers the rest
+                    webhooks._count("dropped", event)
+                    self._reply(503)
+
+            def _reply(self, status: int):
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
\ No newline at end of file